@@ -13,19 +13,27 @@ Key additions
   whole export.
 * Keeps the original standalone-CLI fallback (`python alvys_export.py ...`) for
   parity with the earlier script.
-
-Drop-in replacement; no new dependencies.
+* Pages and entities are fetched concurrently over one shared
+  `aiohttp.ClientSession`; `export_endpoints()` stays a synchronous wrapper
+  around `export_endpoints_async()`.
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import importlib.util
+import logging
 import os
 import sys
+import time
 import traceback
+import weakref
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Tuple
 
+import aiohttp
+import orjson
 import requests
 from dotenv import load_dotenv  # type: ignore
 from config import build_auth_urls
@@ -85,20 +93,44 @@ WEEK_RANGES: List[Tuple[str, str]] = [
 
 OUTPUT_DIR = "alvys_weekly_data"
 PAGE_SIZE = 200
+PREFETCH_PAGES = 4    # speculative in-flight pages per entity
+MAX_CONNECTIONS = 16  # per-run connection pool shared by all entities
+KEEPALIVE_SECONDS = 60
+RETRY_TOTAL = 3       # extra attempts per page on gateway errors and throttling
+RETRY_BACKOFF = 0.5   # seconds; doubled on each retry
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+RETRY_AFTER_MAX = 60  # seconds; cap on a server-sent Retry-After
+# aiohttp decodes gzip/deflate itself and "br" only with a Brotli package.
+ACCEPT_ENCODING = (
+    "gzip, deflate, br"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+    else "gzip, deflate"
+)
 
 # --------------------------------------------
 # LOGGING
 # --------------------------------------------
+_UTC = timezone.utc
+
+
+def _iso_z(dt: datetime) -> str:
+    """Millisecond-precise UTC ISO-8601 string with a ``Z`` suffix."""
+    return dt.astimezone(_UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
 def _now_iso() -> str:  # millisecond-precise UTC timestamp
-    return datetime.utcnow().replace(tzinfo=timezone.utc).isoformat(
-        timespec="milliseconds"
-    )
+    return _iso_z(datetime.now(_UTC))
 
 
 def log(*msg):
     print(f"[{_now_iso()}]", *msg, flush=True)
 
 
+# Per-page chatter goes through logging at DEBUG; ``log()`` above is kept
+# for per-entity progress so hot loops don't contend on flushed stdout.
+logger = logging.getLogger(__name__)
+
+
 # --------------------------------------------
 # AUTH
 # --------------------------------------------
@@ -109,10 +141,180 @@ def get_token() -> str:
     return resp.json()["access_token"]
 
 
+# Bearer tokens per (tenant, client id) -> (token, monotonic expiry).
+_TOKEN_CACHE: Dict[Tuple[str, str], Tuple[str, float]] = {}
+TOKEN_EXPIRY_MARGIN = 30  # seconds; refresh this long before Alvys would
+_TOKEN_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _token_lock() -> asyncio.Lock:
+    # asyncio.Lock binds to one event loop and every asyncio.run() makes a
+    # new one, so keep one lock per running loop.
+    loop = asyncio.get_running_loop()
+    lock = _TOKEN_LOCKS.get(loop)
+    if lock is None:
+        lock = _TOKEN_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+
+async def _get_token(
+    session: aiohttp.ClientSession, auth_url: str, credentials: Mapping
+) -> str:
+    """Return a bearer token for ``credentials``, reusing a cached one.
+
+    Tokens are kept until ``TOKEN_EXPIRY_MARGIN`` seconds before the
+    ``expires_in`` Alvys reports; concurrent callers for the same tenant
+    share a single refresh.
+    """
+    key = (credentials["tenant_id"], credentials["client_id"])
+    cached = _TOKEN_CACHE.get(key)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+
+    async with _token_lock():
+        cached = _TOKEN_CACHE.get(key)  # another task may have refreshed it
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
+        log("Authenticating tenant ->", auth_url)
+        async with session.post(
+            auth_url,
+            data={
+                "client_id": credentials["client_id"],
+                "client_secret": credentials["client_secret"],
+                "grant_type": credentials.get("grant_type", "client_credentials"),
+            },
+        ) as token_resp:
+            token_resp.raise_for_status()
+            body = await token_resp.json(content_type=None)
+        log("OK Token acquired")
+
+        token = body["access_token"]
+        try:
+            ttl = float(body.get("expires_in") or 0)
+        except (TypeError, ValueError):
+            ttl = 0.0
+        if ttl > TOKEN_EXPIRY_MARGIN:
+            _TOKEN_CACHE[key] = (token, time.monotonic() + ttl - TOKEN_EXPIRY_MARGIN)
+        return token
+
+
+def _evict_token(credentials: Mapping, token: str) -> None:
+    """Forget the cached token for ``credentials`` if it is still ``token``.
+
+    Called when Alvys rejects ``token`` (HTTP 401) before its ``expires_in``,
+    e.g. after a revocation or rotation. A token another task has already
+    refreshed is left alone.
+    """
+    key = (credentials["tenant_id"], credentials["client_id"])
+    cached = _TOKEN_CACHE.get(key)
+    if cached and cached[0] == token:
+        del _TOKEN_CACHE[key]
+
+
 # --------------------------------------------
 # PAGINATION HELPER - now 404-safe
 # --------------------------------------------
-def fetch_paginated_data(
+def _retry_after(value: str | None) -> float | None:
+    """Seconds to wait per a ``Retry-After`` header (delta or HTTP date).
+
+    Returns ``None`` when the header is absent or unparsable, so the caller
+    falls back to its own backoff; waits are capped at ``RETRY_AFTER_MAX``.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=_UTC)
+        seconds = (when - datetime.now(_UTC)).total_seconds()
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+
+async def _fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict[str, str],
+    body_tail: bytes,
+    page: int,
+    entity_name: str,
+) -> List[dict] | None:
+    """Return the items of one page, or ``None`` when Alvys answers 404.
+
+    ``body_tail`` is the request body already encoded by
+    :func:`_encode_body_tail`; only the page number is spliced in here.
+    """
+    data = b'{"page":%d,' % page + body_tail
+    logger.debug("POST %s page=%d (entity=%s)", url, page, entity_name)
+
+    attempt = 0
+    while True:
+        try:
+            async with session.post(url, headers=headers, data=data) as resp:
+                if resp.status == 404:
+                    logger.debug(
+                        "STOP Page %d returned 404 - assuming no more pages (entity=%s)",
+                        page,
+                        entity_name,
+                    )
+                    return None
+                if resp.status not in RETRY_STATUSES or attempt >= RETRY_TOTAL:
+                    # Allow other HTTP errors to propagate to caller
+                    resp.raise_for_status()
+                    raw = await resp.read()
+                    logger.debug(
+                        "page=%d encoding=%s bytes=%s->%d (entity=%s)",
+                        page,
+                        resp.headers.get("Content-Encoding", "identity"),
+                        resp.headers.get("Content-Length", "?"),
+                        len(raw),
+                        entity_name,
+                    )
+                    body = orjson.loads(raw)
+                    break
+                reason = f"HTTP {resp.status}"
+                delay = _retry_after(resp.headers.get("Retry-After"))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+            if attempt >= RETRY_TOTAL:
+                raise
+            reason = exc.__class__.__name__
+            delay = None
+        attempt += 1
+        if delay is None:
+            delay = RETRY_BACKOFF * (2 ** (attempt - 1))
+        log(
+            f"RETRY Page {page} failed with {reason} "
+            f"(attempt {attempt}/{RETRY_TOTAL}, wait {delay:g}s, entity={entity_name})"
+        )
+        await asyncio.sleep(delay)
+
+    batch = body.get("Items") or body.get("items") or []
+
+    logger.debug("-> received %d objects (entity=%s, page=%d)", len(batch), entity_name, page)
+    return batch
+
+
+def _encode_body_tail(base_payload: Dict) -> bytes:
+    """Encode ``base_payload`` plus ``pageSize`` once, minus the opening brace.
+
+    Every page request shares the same body except for ``page``; pages are
+    in flight concurrently, so rather than mutating one shared dict the
+    invariant part is serialised once and the page number prepended.
+    """
+    fields = {k: v for k, v in base_payload.items() if k != "page"}
+    fields["pageSize"] = PAGE_SIZE
+    return orjson.dumps(fields)[1:]
+
+
+async def fetch_paginated_data(
+    session: aiohttp.ClientSession,
     url: str,
     headers: Dict[str, str],
     base_payload: Dict,
@@ -125,60 +327,147 @@ def fetch_paginated_data(
 
     Alvys returns HTTP 404 when you request a page beyond the last valid page.
     We treat that 404 as an empty page -> break the loop gracefully.
-    """
-    page = 0
-    items: List[dict] = []
 
-    while True:
-        payload = dict(base_payload, page=page, pageSize=PAGE_SIZE)
-        log(
-            "POST",
-            url,
-            f"page={page}",
-            "... payload keys=" + str(list(payload.keys())),
-            f"(entity={entity_name})",
+    Up to ``PREFETCH_PAGES`` pages are requested speculatively. Once a page
+    signals end-of-data (404, empty or short), requests for later pages are
+    cancelled and results are stitched back together in page order. A page
+    that fails is only fatal if it lies within the data; errors on
+    speculative pages past the end are discarded.
+    """
+    body_tail = _encode_body_tail(base_payload)
+    if logger.isEnabledFor(logging.DEBUG):
+        keys = ["page", *orjson.loads(b"{" + body_tail)]
+        logger.debug("POST %s ... payload keys=%s (entity=%s)", url, keys, entity_name)
+    pages: Dict[int, List[dict] | None] = {}
+    pending: Dict[asyncio.Task, int] = {}
+    next_page = 0
+    last_page: int | None = None  # first page known to end the data
+    errors: Dict[int, BaseException] = {}  # failed pages, raised only if needed
+
+    def launch() -> None:
+        nonlocal next_page
+        task = asyncio.create_task(
+            _fetch_page(session, url, headers, body_tail, next_page, entity_name)
         )
+        pending[task] = next_page
+        next_page += 1
+
+    def collected() -> Tuple[int, int]:
+        """Return (number of contiguous finished pages, items in them)."""
+        page, count = 0, 0
+        while page in pages and pages[page] is not None:
+            count += len(pages[page])
+            page += 1
+        return page, count
+
+    try:
+        for _ in range(PREFETCH_PAGES):
+            launch()
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = pending.pop(task)
+                if last_page is not None and page > last_page:
+                    # Speculative page past the end: its outcome is irrelevant,
+                    # but retrieve any exception so asyncio does not log it.
+                    task.exception()
+                    continue
+                try:
+                    batch = task.result()
+                except Exception as exc:
+                    # Park the failure; it only matters if this page turns
+                    # out to hold data (see the check after the loop).
+                    errors[page] = exc
+                    continue
+                pages[page] = batch
+                if batch is None or len(batch) < PAGE_SIZE:
+                    last_page = page if last_page is None else min(last_page, page)
+
+            if max_items and last_page is None:
+                contiguous, count = collected()
+                if count >= max_items:
+                    last_page = contiguous - 1
+
+            if last_page is not None:
+                for task, page in list(pending.items()):
+                    if page > last_page:
+                        task.cancel()
+                        del pending[task]
+            elif not errors:
+                while len(pending) < PREFETCH_PAGES:
+                    launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if errors:
+        first_error = min(errors)
+        if last_page is None or first_error <= last_page:
+            raise errors[first_error]
 
-        try:
-            resp = requests.post(url, headers=headers, json=payload)
-            if resp.status_code == 404:
-                log(
-                    f"STOP Page {page} returned 404 - assuming no more pages "
-                    f"(entity={entity_name})"
-                )
-                break
-            resp.raise_for_status()
-        except requests.HTTPError as exc:
-            # Allow other HTTP errors to propagate to caller
-            if exc.response is not None and exc.response.status_code == 404:
-                log(
-                    f"STOP Page {page} returned 404 - assuming no more pages "
-                    f"(entity={entity_name})"
-                )
-                break
-            raise
-
-        batch = resp.json().get("Items") or resp.json().get("items") or []
-        log("-> received", len(batch), "objects")
-        if not batch:
-            break
-
-        items.extend(batch)
-        if len(batch) < PAGE_SIZE or (max_items and len(items) >= max_items):
-            break
+    items: List[dict] = []
+    page = 0
+    while pages.get(page):
+        items.extend(pages[page])
         page += 1
+        if last_page is not None and page > last_page:
+            break
 
-    return items[:max_items] if max_items else items
+    if max_items:
+        items = items[:max_items]
+    log("-> received", len(items), "objects over", page, "page(s)", f"(entity={entity_name})")
+    return items
 
 
 # --------------------------------------------
 # FILE HELPERS
 # --------------------------------------------
-def save_json(data: List[dict], filename: str, output_dir: str | Path = OUTPUT_DIR):
-    os.makedirs(output_dir, exist_ok=True)
+_ENSURED_DIRS: set[str] = set()  # output dirs already created this process
+_FILE_ID_FIELD = b'"FILE_ID":'
+
+
+def save_json(
+    data: List[dict],
+    filename: str,
+    output_dir: str | Path = OUTPUT_DIR,
+    *,
+    file_id: str | None = None,
+):
+    """Write ``data`` as a JSON array, one record per line.
+
+    Records are serialised individually so peak memory stays at one record
+    rather than one pretty-printed copy of the whole export. When ``file_id``
+    is given it is emitted as every record's ``FILE_ID`` field while
+    serialising, replacing any ``FILE_ID`` the record already carries, so
+    ``data`` itself is never mutated.
+    """
+    key = str(output_dir)
+    if key not in _ENSURED_DIRS:
+        os.makedirs(key, exist_ok=True)
+        _ENSURED_DIRS.add(key)
     path = Path(output_dir) / filename
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # The FILE_ID field and its separators are encoded once; each record
+    # then only needs one slice + concat to splice it before the brace.
+    field = _FILE_ID_FIELD + orjson.dumps(file_id) + b"}" if file_id is not None else b""
+    tail = b"," + field
+    dumps = orjson.dumps
+    with open(path, "wb") as f:
+        write = f.write
+        write(b"[\n")
+        for i, rec in enumerate(data):
+            if i:
+                write(b",\n")
+            if not field:
+                body = dumps(rec)
+            elif "FILE_ID" in rec:
+                # Splicing would emit the key twice; overwrite it instead.
+                body = dumps({**rec, "FILE_ID": file_id})
+            else:
+                body = dumps(rec)
+                body = body[:-1] + (tail if len(body) > 2 else field)
+            write(body)
+        write(b"\n]\n")
     log("SAVE Wrote", len(data), "records ->", path)
 
 
@@ -187,173 +476,216 @@ def format_range(start_iso: str, end_iso: str) -> str:
 
 
 def get_file_id() -> str:
-    return datetime.utcnow().strftime("%Y%m%d%H%M%S%f")[:-3]  # yyyymmddHHMMSSmmm
+    return datetime.now(_UTC).strftime("%Y%m%d%H%M%S%f")[:-3]  # yyyymmddHHMMSSmmm
+
+
+def _new_session() -> aiohttp.ClientSession:
+    """One pooled session per run; every entity and page shares it."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            # Every request targets integrations.alvys.com: keep handshaken
+            # sockets around across entity batches and retry backoffs.
+            keepalive_timeout=KEEPALIVE_SECONDS,
+            ttl_dns_cache=300,
+        ),
+        timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=120),
+    )
+
+
+async def _export_entity(
+    session: aiohttp.ClientSession,
+    entity: str,
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict,
+    filename: str,
+    output_dir: str | Path,
+    *,
+    reauth: Callable[[str], Awaitable[None]] | None = None,
+) -> None:
+    """Fetch one entity and write it to ``output_dir/filename``.
+
+    If Alvys answers 401, ``reauth`` is awaited with the rejected
+    ``Authorization`` header value (it must refresh ``headers`` in place) and
+    the entity is fetched once more. Failures are logged and reported via
+    ``send_error_notification`` so one broken endpoint does not cancel its
+    siblings.
+    """
+    log("RUN Exporting", entity, "...")
+    try:
+        while True:
+            sent = headers["Authorization"]
+            try:
+                data = await fetch_paginated_data(
+                    session, url, headers, payload, entity_name=entity
+                )
+                break
+            except aiohttp.ClientResponseError as exc:
+                if exc.status != 401 or reauth is None:
+                    raise
+                log("RETRY", entity, "got HTTP 401 - refreshing token")
+                await reauth(sent)
+                reauth = None  # retry once
+        # File I/O blocks; write from a worker thread so sibling entities'
+        # page requests keep flowing on the event loop meanwhile.
+        await asyncio.to_thread(
+            save_json, data, filename, output_dir, file_id=get_file_id()
+        )
+        log("OK", entity, "done")
+    except Exception as exc:
+        trace = traceback.format_exc()
+        msg = f"Failed to export {entity} -> {exc.__class__.__name__}: {exc}"
+        log(f"!!  {msg}\n{trace}")
+        send_error_notification("alvys_export", msg, trace)
 
 
 # --------------------------------------------
 # MAIN EXPORTER (used by main.py)
 # --------------------------------------------
-def export_endpoints(
+async def export_endpoints_async(
     entities: Iterable[str],
-    credentials: Dict[str, str],
+    credentials: Mapping[str, str],
     date_range: Tuple[datetime, datetime],
     output_dir: str | Path,
-):
-    """Export selected endpoints for *one* week range."""
+) -> None:
+    """Export selected endpoints for *one* week range, all entities at once."""
+    wanted = frozenset(e.lower() for e in entities)
     urls = build_auth_urls(credentials["tenant_id"], API_VERSION)
 
-    log("Authenticating tenant ->", urls["auth_url"])
-    token_resp = requests.post(
-        urls["auth_url"],
-        data={
-            "client_id": credentials["client_id"],
-            "client_secret": credentials["client_secret"],
-            "grant_type": credentials.get("grant_type", "client_credentials"),
-        },
-    )
-    token_resp.raise_for_status()
-    log("OK Token acquired")
-    token = token_resp.json()["access_token"]
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "accept": "application/json",
-        "content-type": "application/*+json",
-    }
-
-    start_iso = (
-        date_range[0]
-        .astimezone(timezone.utc)
-        .isoformat(timespec="milliseconds")
-        .replace("+00:00", "Z")
-    )
-    end_iso = (
-        date_range[1]
-        .astimezone(timezone.utc)
-        .isoformat(timespec="milliseconds")
-        .replace("+00:00", "Z")
-    )
-
-    # ----- Range-based endpoints -----
-    endpoints = {
-        "trips": {
-            "url": f"{urls['base_url']}/trips/search",
-            "extra": {
-                "status": [],
-                "range_field": "updatedAtRange",
-                "IncludeDeleted": True,
+    async with _new_session() as session:
+        token = await _get_token(session, urls["auth_url"], credentials)
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "accept": "application/json",
+            "accept-encoding": ACCEPT_ENCODING,
+            "content-type": "application/*+json",
+        }
+
+        async def reauth(rejected: str) -> None:
+            # Shared by every entity: whichever hits the 401 first evicts the
+            # token; the rest find the header already refreshed.
+            _evict_token(credentials, rejected.removeprefix("Bearer "))
+            fresh = await _get_token(session, urls["auth_url"], credentials)
+            headers["Authorization"] = f"Bearer {fresh}"
+
+        start_iso, end_iso = _iso_z(date_range[0]), _iso_z(date_range[1])
+
+        jobs = []
+
+        # ----- Range-based endpoints -----
+        endpoints = {
+            "trips": {
+                "url": f"{urls['base_url']}/trips/search",
+                "extra": {
+                    "status": [],
+                    "range_field": "updatedAtRange",
+                    "IncludeDeleted": True,
+                },
             },
-        },
-        "loads": {
-            "url": f"{urls['base_url']}/loads/search",
-            "extra": {
-                "status": [],
-                "range_field": "updatedAtRange",
-                "IncludeDeleted": True,
+            "loads": {
+                "url": f"{urls['base_url']}/loads/search",
+                "extra": {
+                    "status": [],
+                    "range_field": "updatedAtRange",
+                    "IncludeDeleted": True,
+                },
             },
-        },
-        "invoices": {
-            "url": f"{urls['base_url']}/invoices/search",
-            "extra": {"status": ["Paid"], "range_field": "invoicedDateRange"},
-        },
-    }
+            "invoices": {
+                "url": f"{urls['base_url']}/invoices/search",
+                "extra": {"status": ["Paid"], "range_field": "invoicedDateRange"},
+            },
+        }
 
-    for name, cfg in endpoints.items():
-        if name not in entities:
-            continue
-        log("RUN Exporting", name.upper(), "...")
-        try:
+        for name, cfg in endpoints.items():
+            if name not in wanted:
+                continue
             rf = cfg["extra"].get("range_field", "updatedAtRange")
             extra = {k: v for k, v in cfg["extra"].items() if k != "range_field"}
             payload = {rf: {"start": start_iso, "end": end_iso}, **extra}
-            data = fetch_paginated_data(
-                cfg["url"], headers, payload, entity_name=name.upper()
-            )
-            file_id = get_file_id()
-            for rec in data:
-                rec["FILE_ID"] = file_id
             fname = f"{name.upper()}_API_{format_range(start_iso, end_iso)}.json"
-            save_json(data, fname, output_dir)
-            log("OK", name.upper(), "done")
-        except Exception as exc:
-            trace = traceback.format_exc()
-            msg = (
-                f"Failed to export {name.upper()} -> {exc.__class__.__name__}: {exc}"
-            )
-            log(f"!!  {msg}\n{trace}")
-            send_error_notification("alvys_export", msg, trace)
-
-    # ----- Non-range endpoints -----
-    def do_simple(entity: str, payload: Dict):
-        if entity.lower() not in [e.lower() for e in entities]:
-            return
-        log("RUN Exporting", entity, "...")
-        try:
-            data = fetch_paginated_data(
-                f"{urls['base_url']}/{entity.lower()}/search",
-                headers,
-                payload,
-                entity_name=entity,
+            jobs.append(
+                _export_entity(
+                    session, name.upper(), cfg["url"], headers, payload, fname, output_dir,
+                    reauth=reauth,
+                )
             )
-            file_id = get_file_id()
-            for rec in data:
-                rec["FILE_ID"] = file_id
-            save_json(data, f"{entity}.json", output_dir)
-            log("OK", entity, "done")
-        except Exception as exc:
-            trace = traceback.format_exc()
-            msg = (
-                f"Failed to export {entity} -> {exc.__class__.__name__}: {exc}"
+
+        # ----- Non-range endpoints -----
+        def do_simple(entity: str, payload: Dict):
+            if entity.lower() not in wanted:
+                return
+            jobs.append(
+                _export_entity(
+                    session,
+                    entity,
+                    f"{urls['base_url']}/{entity.lower()}/search",
+                    headers,
+                    payload,
+                    f"{entity}.json",
+                    output_dir,
+                    reauth=reauth,
+                )
             )
-            log(f"!!  {msg}\n{trace}")
-            send_error_notification("alvys_export", msg, trace)
 
-    do_simple("DRIVERS", {"name": "", "employeeId": "", "fleetName": "", "status": []})
-    do_simple(
-        "TRUCKS",
-        {
-            "truckNumber": "",
-            "fleetName": "",
-            "vinNumber": "",
-            "registeredName": "",
-            "status": [],
-        },
-    )
-    do_simple(
-        "TRAILERS",
-        {"status": [], "trailerNumber": "", "fleetName": "", "vinNumber": ""},
-    )
-    do_simple("CUSTOMERS", {"statuses": ["Active", "Inactive", "Disabled"]})
-    do_simple(
-        "CARRIERS",
-        {
-            "status": [
-                "Pending",
-                "Active",
-                "Expired Insurance",
-                "Interested",
-                "Invited",
-                "Packet Sent",
-                "Packet Completed",
-            ],
-        },
+        do_simple("DRIVERS", {"name": "", "employeeId": "", "fleetName": "", "status": []})
+        do_simple(
+            "TRUCKS",
+            {
+                "truckNumber": "",
+                "fleetName": "",
+                "vinNumber": "",
+                "registeredName": "",
+                "status": [],
+            },
+        )
+        do_simple(
+            "TRAILERS",
+            {"status": [], "trailerNumber": "", "fleetName": "", "vinNumber": ""},
+        )
+        do_simple("CUSTOMERS", {"statuses": ["Active", "Inactive", "Disabled"]})
+        do_simple(
+            "CARRIERS",
+            {
+                "status": [
+                    "Pending",
+                    "Active",
+                    "Expired Insurance",
+                    "Interested",
+                    "Invited",
+                    "Packet Sent",
+                    "Packet Completed",
+                ],
+            },
+        )
+
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+
+def export_endpoints(
+    entities: Iterable[str],
+    credentials: Mapping[str, str],
+    date_range: Tuple[datetime, datetime],
+    output_dir: str | Path,
+):
+    """Synchronous entry point for :func:`export_endpoints_async`."""
+    asyncio.run(
+        export_endpoints_async(
+            entities=entities,
+            credentials=credentials,
+            date_range=date_range,
+            output_dir=output_dir,
+        )
     )
 
 
 # --------------------------------------------
 # STANDALONE CLI (optional legacy path)
 # --------------------------------------------
-def cli_run(argv: List[str]) -> None:
-    """
-    Allows running *just* this file:
-
-        python alvys_export.py trips loads
-
-    Uses the static .env credentials (no SCAC lookup) and writes into
-    `alvys_weekly_data/`.
-    """
-    args = [a.lower() for a in argv]
-    run_all = len(args) == 0
+async def _cli_run_async(argv: List[str]) -> None:
+    args = {a.lower() for a in argv}
+    run_all = not args
     scac = os.getenv("ALVYS_SCAC", "").upper() or "UNKNOWN"
     out_dir = Path(OUTPUT_DIR) / scac
 
@@ -361,6 +693,7 @@ def cli_run(argv: List[str]) -> None:
     headers = {
         "Authorization": f"Bearer {token}",
         "accept": "application/json",
+        "accept-encoding": ACCEPT_ENCODING,
         "content-type": "application/*+json",
     }
 
@@ -387,43 +720,6 @@ def cli_run(argv: List[str]) -> None:
         },
     }
 
-    for (start, end) in WEEK_RANGES:
-        log("-> Date range", start, "->", end)
-        for name, cfg in endpoints.items():
-            if not (run_all or name in args):
-                continue
-
-            log("RUN Exporting", name.upper(), "...")
-            rf = cfg["extra_payload"].get("range_field", "updatedAtRange")
-            extra = {
-                k: v for k, v in cfg["extra_payload"].items() if k != "range_field"
-            }
-            payload = {
-                rf: {"start": start, "end": end},
-                **extra,
-            }
-
-            try:
-                data = fetch_paginated_data(
-                    cfg["url"],
-                    headers,
-                    payload,
-                    entity_name=name.upper(),
-                )
-                file_id = get_file_id()
-                for rec in data:
-                    rec["FILE_ID"] = file_id
-                fname = f"{name.upper()}_API_{format_range(start, end)}.json"
-                save_json(data, fname, out_dir)
-                log("OK", name.upper(), "done")
-            except Exception as exc:
-                trace = traceback.format_exc()
-                msg = (
-                    f"Failed to export {name.upper()} -> {exc.__class__.__name__}: {exc}"
-                )
-                log(f"!!  {msg}\n{trace}")
-                send_error_notification("alvys_export", msg, trace)
-
     # Simple (non-range) endpoints
     simple_endpoints = {
         "drivers": {"name": "", "employeeId": "", "fleetName": "", "status": []},
@@ -449,30 +745,57 @@ def cli_run(argv: List[str]) -> None:
         },
     }
 
-    for name, payload in simple_endpoints.items():
-        if not (run_all or name in args):
-            continue
-        log("RUN Exporting", name.upper(), "...")
-        try:
-            data = fetch_paginated_data(
+    async with _new_session() as session:
+        for (start, end) in WEEK_RANGES:
+            log("-> Date range", start, "->", end)
+            jobs = []
+            for name, cfg in endpoints.items():
+                if not (run_all or name in args):
+                    continue
+                rf = cfg["extra_payload"].get("range_field", "updatedAtRange")
+                extra = {
+                    k: v for k, v in cfg["extra_payload"].items() if k != "range_field"
+                }
+                payload = {
+                    rf: {"start": start, "end": end},
+                    **extra,
+                }
+                fname = f"{name.upper()}_API_{format_range(start, end)}.json"
+                jobs.append(
+                    _export_entity(
+                        session, name.upper(), cfg["url"], headers, payload, fname, out_dir
+                    )
+                )
+            await asyncio.gather(*jobs, return_exceptions=True)
+
+        jobs = [
+            _export_entity(
+                session,
+                name.upper(),
                 f"{BASE_URL}/{name}/search",
                 headers,
                 payload,
-                entity_name=name.upper(),
-            )
-            file_id = get_file_id()
-            for rec in data:
-                rec["FILE_ID"] = file_id
-            save_json(data, f"{name.upper()}.json", out_dir)
-            log("OK", name.upper(), "done")
-        except Exception as exc:
-            trace = traceback.format_exc()
-            msg = (
-                f"Failed to export {name.upper()} -> {exc.__class__.__name__}: {exc}"
+                f"{name.upper()}.json",
+                out_dir,
             )
-            log(f"!!  {msg}\n{trace}")
-            send_error_notification("alvys_export", msg, trace)
+            for name, payload in simple_endpoints.items()
+            if run_all or name in args
+        ]
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+
+def cli_run(argv: List[str]) -> None:
+    """
+    Allows running *just* this file:
+
+        python alvys_export.py trips loads
+
+    Uses the static .env credentials (no SCAC lookup) and writes into
+    `alvys_weekly_data/`.
+    """
+    asyncio.run(_cli_run_async(argv))
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     cli_run(sys.argv[1:])
@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 import sys
 import time
 from datetime import datetime
@@ -11,19 +10,21 @@ load_dotenv()
 
 import db
 DATA_DIR = "alvys_weekly_data"
-BATCH_SIZE = 500
+BATCH_SIZE = db.INSERT_BATCH_SIZE
+_EMPTY: Dict = {}  # shared stand-in for missing nested objects; never mutated
 # Database connection handled via db.get_conn()
 
 
 def sanitize_driver(d: Dict) -> Dict:
+    fleet = d.get("Fleet") or _EMPTY
     return {
         "ID": d.get("Id"),
         "EMPLOYEE_ID": d.get("EmployeeId"),
         "DRIVER_TYPE": d.get("Type"),
         "SUBSIDIARY_ID": d.get("SubsidiaryId"),
-        "ZIP_CODE": d.get("Address", {}).get("ZipCode"),
-        "FLEET_ID": d.get("Fleet", {}).get("Id"),
-        "FLEET_NAME": d.get("Fleet", {}).get("Name"),
+        "ZIP_CODE": (d.get("Address") or _EMPTY).get("ZipCode"),
+        "FLEET_ID": fleet.get("Id"),
+        "FLEET_NAME": fleet.get("Name"),
         "CREATED_DTTM": safe_datetime(d.get("CreatedAt")),
         "IS_ACTIVE": int(d.get("IsActive", False)),
         "HIRED_DTTM": safe_datetime(d.get("HiredAt")),
@@ -31,18 +32,20 @@ def sanitize_driver(d: Dict) -> Dict:
     }
 
 def sanitize_truck(t: Dict) -> Dict:
+    fleet = t.get("Fleet") or _EMPTY
+    year = t.get("Year")
     return {
         "ID": t.get("Id"),
         "TRUCK_NUM": t.get("TruckNum"),
         "VIN_NUMBER": t.get("VinNumber"),
-        "YEAR": str(t.get("Year")) if t.get("Year") is not None else None,
+        "YEAR": str(year) if year is not None else None,
         "MAKE": t.get("Make"),
         "MODEL": t.get("Model"),
         "LICENSE_STATE": t.get("LicenseState"),
         "TRUCK_TYPE": t.get("TruckType"),
         "SUBSIDIARY_ID": t.get("SubsidiaryId"),
-        "FLEET_ID": t.get("Fleet", {}).get("Id"),
-        "FLEET_NAME": t.get("Fleet", {}).get("Name"),
+        "FLEET_ID": fleet.get("Id"),
+        "FLEET_NAME": fleet.get("Name"),
         "CREATED_DTTM": safe_datetime(t.get("CreatedAt")),
         "FILE_ID": t.get("FILE_ID")
     }
@@ -58,16 +61,18 @@ def sanitize_trailer(t: Dict) -> Dict:
     }
 
 def sanitize_customer(c: Dict) -> Dict:
+    billing = c.get("BillingAddress") or _EMPTY
+    invoicing = c.get("InvoicingInformation") or _EMPTY
     return {
         "ID": c.get("Id"),
         "CUSTOMER_NAME": c.get("Name"),
         "COMPANY_NUMBER": c.get("CompanyNumber"),
         "CUSTOMER_TYPE": c.get("Type"),
         "CUSTOMER_STATUS": c.get("Status"),
-        "BILLING_ADDRESS": ", ".join([c.get("BillingAddress", {}).get(k, '') for k in ("Street", "City", "State", "ZipCode")]),
+        "BILLING_ADDRESS": ", ".join([billing.get(k, '') for k in ("Street", "City", "State", "ZipCode")]),
         "CREATED_DTTM": safe_datetime(c.get("DateCreated")),
-        "INVOICING_NAME": c.get("InvoicingInformation", {}).get("InvoicingName"),
-        "INVOICING_ALIAS": c.get("InvoicingInformation", {}).get("InvoicingNameAlias"),
+        "INVOICING_NAME": invoicing.get("InvoicingName"),
+        "INVOICING_ALIAS": invoicing.get("InvoicingNameAlias"),
         "FILE_ID": c.get("FILE_ID")
     }
 
@@ -96,69 +101,79 @@ def batch_insert(table: str, records: List[Dict], conn):
         return
 
     inserted_dttm = datetime.now()
-    for rec in records:
-        rec["INSERTED_DTTM"] = inserted_dttm
 
-    df = pd.DataFrame(records)
-    columns = ", ".join(df.columns)
-    placeholders = ", ".join(["?" for _ in df.columns])
+    # Every sanitize_* dict has the same keys, so rows go straight to tuples
+    # without a DataFrame round-trip; missing values are already None.
+    # INSERTED_DTTM is appended per tuple instead of written into each record.
+    cols = list(records[0])
+    rows = [(*map(r.get, cols), inserted_dttm) for r in records]
+    cols.append("INSERTED_DTTM")
+    columns = ", ".join(cols)
+    placeholders = ", ".join(["?" for _ in cols])
     insert_sql = f"INSERT INTO dbo.{table} ({columns}) VALUES ({placeholders})"
 
     cursor = conn.cursor()
     cursor.fast_executemany = True
     start = time.time()
-    for i in range(0, len(df), BATCH_SIZE):
-        batch = df.iloc[i:i + BATCH_SIZE].where(pd.notnull(df), None).values.tolist()
-        cursor.executemany(insert_sql, batch)
-    conn.commit()
+    for i in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(insert_sql, rows[i:i + BATCH_SIZE])
     duration = time.time() - start
-    print(f"OK Inserted {len(df)} records into {table} in {duration:.2f} seconds")
+    print(f"OK Inserted {len(rows)} records into {table} in {duration:.2f} seconds")
 
 def main():
     args = [arg.lower() for arg in sys.argv[1:]]
     run_all = len(args) == 0
 
     conn = db.get_conn()
-
-    if run_all or "trailers" in args:
-        print("Loading trailers JSON...")
-        trailers = [
-            sanitize_trailer(t)
-            for t in load_json(os.path.join(DATA_DIR, "TRAILERS.json"))
-        ]
-        batch_insert("ALVYS_TRAILERS_RAW", trailers, conn)
-
-    if run_all or "trucks" in args:
-        print("Loading trucks JSON...")
-        trucks = [
-            sanitize_truck(t)
-            for t in load_json(os.path.join(DATA_DIR, "TRUCKS.json"))
-        ]
-        batch_insert("ALVYS_TRUCKS_RAW", trucks, conn)
-
-    if run_all or "drivers" in args:
-        print("Loading drivers JSON...")
-        drivers = [
-            sanitize_driver(d)
-            for d in load_json(os.path.join(DATA_DIR, "DRIVERS.json"))
-        ]
-        batch_insert("ALVYS_DRIVERS_RAW", drivers, conn)
-
-    if run_all or "customers" in args:
-        print("Loading customers JSON...")
-        customers = [
-            sanitize_customer(c)
-            for c in load_json(os.path.join(DATA_DIR, "CUSTOMERS.json"))
-        ]
-        batch_insert("ALVYS_CUSTOMERS_RAW", customers, conn)
-
-    if run_all or "carriers" in args:
-        print("Loading carriers JSON...")
-        raw = load_json(os.path.join(DATA_DIR, "CARRIERS.json"))
-        items = raw.get("Items") if isinstance(raw, dict) else raw
-        carriers = [sanitize_carrier(c) for c in items]
-        batch_insert("ALVYS_CARRIERS_RAW", carriers, conn)
-
+    # Every table goes in one transaction: a single commit (and log flush)
+    # at the end, and nothing half-loaded if a later table fails.
+    conn.driver_connection.autocommit = False
+    try:
+        if run_all or "trailers" in args:
+            print("Loading trailers JSON...")
+            trailers = [
+                sanitize_trailer(t)
+                for t in load_json(os.path.join(DATA_DIR, "TRAILERS.json"))
+            ]
+            batch_insert("ALVYS_TRAILERS_RAW", trailers, conn)
+
+        if run_all or "trucks" in args:
+            print("Loading trucks JSON...")
+            trucks = [
+                sanitize_truck(t)
+                for t in load_json(os.path.join(DATA_DIR, "TRUCKS.json"))
+            ]
+            batch_insert("ALVYS_TRUCKS_RAW", trucks, conn)
+
+        if run_all or "drivers" in args:
+            print("Loading drivers JSON...")
+            drivers = [
+                sanitize_driver(d)
+                for d in load_json(os.path.join(DATA_DIR, "DRIVERS.json"))
+            ]
+            batch_insert("ALVYS_DRIVERS_RAW", drivers, conn)
+
+        if run_all or "customers" in args:
+            print("Loading customers JSON...")
+            customers = [
+                sanitize_customer(c)
+                for c in load_json(os.path.join(DATA_DIR, "CUSTOMERS.json"))
+            ]
+            batch_insert("ALVYS_CUSTOMERS_RAW", customers, conn)
+
+        if run_all or "carriers" in args:
+            print("Loading carriers JSON...")
+            raw = load_json(os.path.join(DATA_DIR, "CARRIERS.json"))
+            items = raw.get("Items") if isinstance(raw, dict) else raw
+            carriers = [sanitize_carrier(c) for c in items]
+            batch_insert("ALVYS_CARRIERS_RAW", carriers, conn)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     print("\nOK All data inserted.")
 
 if __name__ == "__main__":
@@ -13,7 +13,8 @@ from __future__ import annotations
 
 import os
 import functools
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping
 from dotenv import load_dotenv  # type: ignore
 import pyodbc
 
@@ -27,13 +28,21 @@ load_dotenv()
 _TABLE = "dbo.ALVYS_CLIENTS"
 _COLS = ["TENANT_ID", "CLIENT_ID", "CLIENT_SECRET", "GRANT_TYPE"]
 
+# Static credentials from the environment (bypass the DB lookup when complete)
+_ENV_CREDENTIALS: Mapping[str, str | None] = MappingProxyType({
+    "tenant_id": os.getenv("ALVYS_TENANT_ID"),
+    "client_id": os.getenv("ALVYS_CLIENT_ID"),
+    "client_secret": os.getenv("ALVYS_CLIENT_SECRET"),
+    "grant_type": os.getenv("ALVYS_GRANT_TYPE"),
+})
+
 
 # ---------------------------------------------------------------------------
 # Low-level helpers
 # ---------------------------------------------------------------------------
 
 def _get_sql_connection() -> pyodbc.Connection:
-    """Return a live ``pyodbc`` connection using ``ALVYS_SQL_CONN_STR``."""
+    """Return a pooled ``pyodbc`` connection using ``ALVYS_SQL_CONN_STR``."""
     return get_conn()
 
 
@@ -41,16 +50,15 @@ def _get_sql_connection() -> pyodbc.Connection:
 # Public API
 # ---------------------------------------------------------------------------
 
-@functools.lru_cache(maxsize=128)
-def get_credentials(scac: str) -> Dict[str, str]:
+def get_credentials(scac: str) -> Mapping[str, str]:
     """Look up a client's auth credentials by SCAC.
 
     If the four ``ALVYS_*`` environment variables are present
     (``ALVYS_TENANT_ID``, ``ALVYS_CLIENT_ID``, ``ALVYS_CLIENT_SECRET`` and
     ``ALVYS_GRANT_TYPE``) their values are returned directly and the
-    database is not queried.
+    database is not queried. They are read once, at import time.
 
-    Returns a dict ::
+    Returns a read-only mapping ::
         {
           "tenant_id": str,
           "client_id": str,
@@ -58,19 +66,17 @@ def get_credentials(scac: str) -> Dict[str, str]:
           "grant_type": str,
         }
 
-    Results are **LRU-cached** so subsequent calls in the same run avoid extra
-    network trips.
+    Results are **LRU-cached** per normalised SCAC so subsequent calls in the
+    same run avoid extra network trips; the mapping is immutable so callers
+    cannot corrupt the cached entry.
     """
-    env_creds = {
-        "tenant_id": os.getenv("ALVYS_TENANT_ID"),
-        "client_id": os.getenv("ALVYS_CLIENT_ID"),
-        "client_secret": os.getenv("ALVYS_CLIENT_SECRET"),
-        "grant_type": os.getenv("ALVYS_GRANT_TYPE"),
-    }
-    if all(env_creds.values()):
-        return env_creds  # type: ignore[return-value]
-
-    scac = scac.upper().strip()
+    if all(_ENV_CREDENTIALS.values()):
+        return _ENV_CREDENTIALS
+    return _get_credentials_cached(scac.upper().strip())
+
+
+@functools.lru_cache(maxsize=128)
+def _get_credentials_cached(scac: str) -> Mapping[str, str]:
     placeholders = ", ".join(_COLS)
     query = (
         f"SELECT {placeholders} FROM {_TABLE} WITH (NOLOCK) WHERE SCAC = ?"
@@ -84,8 +90,7 @@ def get_credentials(scac: str) -> Dict[str, str]:
                 f"SCAC '{scac}' not found in {_TABLE}. Did you add the client?"
             )
 
-    creds = dict(zip([c.lower() for c in _COLS], row))
-    return creds  # type: ignore[return-value]
+    return MappingProxyType(dict(zip([c.lower() for c in _COLS], row)))
 
 
 def build_auth_urls(tenant_id: str, api_version: str = "1") -> Dict[str, str]:
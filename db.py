@@ -5,14 +5,19 @@ SQLAlchemy engines using the ``ALVYS_SQL_CONN_STR`` environment variable.
 """
 
 from __future__ import annotations
+import contextlib
+import functools
 import os
 import time
 from datetime import datetime, timedelta
 import urllib.parse
 import logging
 import traceback
+from typing import Iterable, Sequence
 import pyodbc
 from sqlalchemy import create_engine
+from sqlalchemy import types as sqltypes
+from sqlalchemy.pool import QueuePool
 from utils.alerts import send_error_notification
 
 def _get_conn_str() -> str:
@@ -35,8 +40,8 @@ def _upgrade_driver_and_tls(conn_str: str) -> str:
         s = s.rstrip(";") + ";TrustServerCertificate=yes"
     return s
 
-def get_conn(*, retries: int = 4, base_delay: float = 0.5) -> pyodbc.Connection:
-    """Return a ``pyodbc.Connection`` with simple retry/backoff and ODBC18 fallback."""
+def _connect(*, retries: int = 4, base_delay: float = 0.5) -> pyodbc.Connection:
+    """Open a ``pyodbc.Connection`` with simple retry/backoff and ODBC18 fallback."""
     raw = _get_conn_str()
     attempt = 0
     while True:
@@ -57,39 +62,229 @@ def get_conn(*, retries: int = 4, base_delay: float = 0.5) -> pyodbc.Connection:
                 raise
             time.sleep(base_delay * (2 ** (attempt - 1)))
 
-def get_engine(**kw):
-    """Return a SQLAlchemy engine using ``mssql+pyodbc``."""
+@functools.lru_cache(maxsize=None)
+def _pool() -> QueuePool:
+    # Azure SQL drops idle sessions after ~30 min; recycle before that. It can
+    # also drop them early (failover, gateway reset), so every checkout is
+    # pinged through the mssql dialect and dead sessions are replaced via
+    # ``_connect`` with its usual retry/backoff.
+    return QueuePool(
+        _connect,
+        pool_size=4,
+        max_overflow=4,
+        recycle=1_500,
+        pre_ping=True,
+        dialect=_default_engine().dialect,
+    )
+
+
+def get_conn():
+    """Return a pooled ``pyodbc`` connection.
+
+    The object proxies ``pyodbc.Connection``; ``close()`` (or leaving a
+    ``with`` block) hands the authenticated session back to a process-wide
+    pool instead of logging out, so later lookups skip the login round-trip.
+    Pooled sessions are pinged before reuse; a dead one is reopened.
+    Uncommitted work is rolled back on return.
+    """
+    return _pool().connect()
+
+def _engine_url() -> str:
     conn_str = urllib.parse.quote_plus(_upgrade_driver_and_tls(_get_conn_str()))
-    url = f"mssql+pyodbc:///?odbc_connect={conn_str}"
-    return create_engine(url, **kw)
+    return f"mssql+pyodbc:///?odbc_connect={conn_str}"
 
 
-def exec_client_upload_id(scac: str) -> None:
-    """Execute ``dbo.INSERT_CLIENT_UPLOAD_ID`` for ``scac`` using this week's Monday."""
+# Every engine binds executemany parameter arrays in one round-trip
+# (fast_executemany) instead of a prepare/execute per row, and skips
+# SQLAlchemy's batched "insertmanyvalues" rewrite, which is markedly slower
+# than fast_executemany for bulk loads into Azure SQL.
+_BULK_OPTIONS = {"fast_executemany": True, "use_insertmanyvalues": False}
+
+
+@functools.lru_cache(maxsize=None)
+def _default_engine():
+    return create_engine(
+        _engine_url(),
+        pool_size=4,
+        pool_pre_ping=True,
+        **_BULK_OPTIONS,
+    )
+
+
+def get_engine(**kw):
+    """Return a SQLAlchemy engine using ``mssql+pyodbc``.
+
+    Without keyword arguments the process-wide pooled engine is returned, so
+    every loader in a run shares its authenticated connections. Passing
+    ``create_engine`` options builds a dedicated engine instead; the bulk
+    options above apply unless overridden.
+    """
+    if not kw:
+        return _default_engine()
+    return create_engine(_engine_url(), **{**_BULK_OPTIONS, **kw})
+
+
+# Rows per executemany call. fast_executemany binds whole parameter arrays,
+# so SQL Server's 2100-parameter cap does not apply and large batches just
+# mean fewer TDS round-trips.
+INSERT_BATCH_SIZE = 10_000
+
+
+def frame_rows(df) -> list[tuple]:
+    """Return the rows of a DataFrame as tuples with NaN/NaT mapped to ``None``.
+
+    Works column by column: only columns that actually hold missing values
+    get the ``v != v`` NaN check, and no second full-frame copy is built.
+    """
+    columns = []
+    for _, col in df.items():
+        values = col.tolist()
+        if col.hasnans:
+            values = [None if v != v else v for v in values]
+        columns.append(values)
+    return list(zip(*columns))
+
+
+def input_sizes(columns: Sequence[str], dtype_map: dict) -> list[tuple | None]:
+    """Build ``cursor.setinputsizes`` entries from a SQLAlchemy dtype map.
+
+    String columns are declared as ``NVARCHAR(n)`` with their table length.
+    That is pyodbc's own wide binding, sized in characters like the loaders'
+    ``_s(v, n)`` truncation, so non-ASCII text is neither cut short nor run
+    through a code page. Other columns get ``None`` and keep what the driver
+    describes.
+    """
+    sizes: list[tuple | None] = []
+    for col in columns:
+        t = dtype_map.get(col)
+        if isinstance(t, sqltypes.String) and t.length:
+            sizes.append((pyodbc.SQL_WVARCHAR, t.length, 0))
+        else:
+            sizes.append(None)
+    return sizes
+
+
+def insert_sql(schema: str, table: str, columns: Sequence[str]) -> str:
+    """Return a parameterised ``INSERT`` for ``columns`` of ``schema.table``."""
+    return (
+        f"INSERT INTO {schema}.{table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+
+
+def bulk_cursor(raw, sizes: Sequence[tuple | None] | None = None):
+    """Open a ``fast_executemany`` cursor on the DBAPI connection ``raw``.
+
+    ``sizes`` (see :func:`input_sizes`) pins parameter types so string
+    buffers are bound as ``NVARCHAR`` of the column width rather than as
+    whatever the driver infers.
+    """
+    cur = raw.cursor()
+    cur.fast_executemany = True
+    if sizes:
+        cur.setinputsizes(list(sizes))
+    return cur
+
+
+def executemany_batches(cur, sql: str, rows: Sequence[Sequence], chunk_size: int) -> None:
+    """Send ``rows`` through ``cur.executemany`` ``chunk_size`` rows at a time."""
+    for i in range(0, len(rows), chunk_size):
+        cur.executemany(sql, rows[i:i + chunk_size])
+
+
+def fast_insert(
+    conn,
+    schema: str,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Sequence],
+    *,
+    chunk_size: int | None = None,
+    sizes: Sequence[tuple | None] | None = None,
+) -> None:
+    """Insert ``rows`` into ``schema.table`` with pyodbc ``fast_executemany``.
+
+    ``conn`` is a DBAPI connection (see :func:`transaction`), so the
+    parameter arrays are bound by the ODBC driver directly instead of
+    pandas/SQLAlchemy building statements per chunk. ``rows`` must already
+    use ``None`` for NULL. ``sizes`` is passed to :func:`bulk_cursor`.
+    Nothing is committed here; the caller's transaction owns that.
+    """
+    sql = insert_sql(schema, table, columns)
+    step = chunk_size or INSERT_BATCH_SIZE
+    executemany_batches(bulk_cursor(conn, sizes), sql, rows, step)
+
+
+@contextlib.contextmanager
+def transaction(conn=None):
+    """Yield a DBAPI connection whose work is committed once at the end.
+
+    Without ``conn`` a pooled connection is checked out from the default
+    engine, committed when the block exits cleanly and rolled back on any
+    error. Passing an existing ``conn`` joins the caller's transaction
+    instead: it is yielded as-is and left for the caller to commit/close.
+    """
+    if conn is not None:
+        yield conn
+        return
+    raw = get_engine().raw_connection()
+    raw.driver_connection.autocommit = False
+    try:
+        yield raw
+        raw.commit()
+    except BaseException:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def _current_upload_id() -> str:
     today = datetime.utcnow().date()
     monday = today - timedelta(days=today.weekday())
-    upload_id = monday.strftime("%Y%m%d")
+    return monday.strftime("%Y%m%d")
+
+
+def exec_client_upload_ids(scacs: Iterable[str]) -> None:
+    """Execute ``dbo.INSERT_CLIENT_UPLOAD_ID`` for every SCAC in one batch.
+
+    All SCACs share this week's Monday as upload id. The calls go through
+    a plain ``executemany`` on a single connection and are committed once,
+    so an end-of-run over many tenants needs one login instead of N.
+    ``fast_executemany`` is deliberately left off: ODBC parameter arrays can
+    stop after the first set when a procedure emits row counts.
+    """
+    scacs = list(dict.fromkeys(scacs))
+    if not scacs:
+        return
+    upload_id = _current_upload_id()
     try:
         with get_conn() as conn, conn.cursor() as cur:
             logging.info(
-                "Executing INSERT_CLIENT_UPLOAD_ID for %s with upload_id %s",
-                scac,
+                "Executing INSERT_CLIENT_UPLOAD_ID for %d SCAC(s) with upload_id %s",
+                len(scacs),
                 upload_id,
             )
-            cur.execute(
+            cur.executemany(
                 "EXEC dbo.INSERT_CLIENT_UPLOAD_ID @SCAC=?, @Uploadid=?",
-                scac,
-                upload_id,
+                [(scac, upload_id) for scac in scacs],
             )
             conn.commit()
             logging.info(
-                "Successfully executed INSERT_CLIENT_UPLOAD_ID for %s", scac
+                "Successfully executed INSERT_CLIENT_UPLOAD_ID for %s",
+                ", ".join(scacs),
             )
     except Exception as exc:  # pragma: no cover - notify and re-raise
         stack = traceback.format_exc()
         logging.error(
-            "Failed to execute INSERT_CLIENT_UPLOAD_ID for %s: %s", scac, exc
+            "Failed to execute INSERT_CLIENT_UPLOAD_ID for %s: %s",
+            ", ".join(scacs),
+            exc,
         )
         send_error_notification("exec_client_upload_id", str(exc), stack)
         raise
 
+
+def exec_client_upload_id(scac: str) -> None:
+    """Execute ``dbo.INSERT_CLIENT_UPLOAD_ID`` for ``scac`` using this week's Monday."""
+    exec_client_upload_ids([scac])
@@ -1,54 +1,85 @@
 """Activity to export and insert data for a single client."""
 
+import asyncio
 import logging
 import os
+from datetime import date
 from pathlib import Path
 from typing import Dict, Any
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-from main import ENTITIES, DATA_DIR, run_export, run_insert
-import db
-from utils.blob import upload_weekly_json
+from main import ENTITIES, DATA_DIR, run_export_async, run_insert
+from utils.blob import upload_weekly_json_async
 from utils.alerts import send_error_notification
 
+CLEANUP_WORKERS = 8
 
-def main(params: Dict[str, Any]) -> str:
+
+def _unlink(path: str) -> bool:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logging.warning("Could not remove %s: %s", path, exc)
+        return False
+    return True
+
+
+def _remove_json_files(data_dir: Path) -> int:
+    """Delete the ``*.json`` files directly under ``data_dir``.
+
+    ``os.scandir`` yields names without an extra ``stat`` per entry and the
+    unlinks run concurrently, which matters on network-mounted storage.
+    Returns the number of files removed.
+    """
+    with os.scandir(data_dir) as it:
+        targets = [
+            e.path for e in it
+            if e.name.endswith(".json") and e.is_file(follow_symlinks=False)
+        ]
+    if not targets:
+        return 0
+    with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as ex:
+        return sum(ex.map(_unlink, targets))
+
+
+async def _amain(params: Dict[str, Any]) -> str:
     scac = params["scac"]
     creds = params["credentials"]
     data_dir = Path(params.get("data_dir") or (DATA_DIR / scac.upper()))
 
+    data_dir.mkdir(parents=True, exist_ok=True)
+    removed = 0
     try:
-        os.environ["ALVYS_TENANT_ID"] = creds["tenant_id"]
-        os.environ["ALVYS_CLIENT_ID"] = creds["client_id"]
-        os.environ["ALVYS_CLIENT_SECRET"] = creds["client_secret"]
-        os.environ["ALVYS_GRANT_TYPE"] = creds["grant_type"]
-
-        data_dir.mkdir(parents=True, exist_ok=True)
-        removed = []
-        try:
-            if os.access(data_dir, os.W_OK):
-                removed = list(data_dir.glob("*.json"))
-                for json_file in removed:
-                    try:
-                        json_file.unlink(missing_ok=True)
-                    except OSError as exc:
-                        logging.warning("Could not remove %s: %s", json_file, exc)
-            else:
-                logging.warning("Skipping JSON cleanup for read-only directory %s", data_dir)
-        except Exception as exc:
-            logging.warning("Failed to remove existing JSON files from %s: %s", data_dir, exc)
-            removed = []
-        if removed:
-            logging.info("Removed %d existing JSON files from %s", len(removed), data_dir)
-
-        logging.info("Processing %s", scac)
-        run_export(scac, ENTITIES, weeks_ago=0, dry_run=False, output_dir=data_dir)
-        run_insert(scac, ENTITIES, dry_run=False, data_dir=data_dir)
-        db.exec_client_upload_id(scac)
-        upload_weekly_json(scac, data_dir)
-        return scac
+        if os.access(data_dir, os.W_OK):
+            removed = _remove_json_files(data_dir)
+        else:
+            logging.warning("Skipping JSON cleanup for read-only directory %s", data_dir)
+    except Exception as exc:
+        logging.warning("Failed to remove existing JSON files from %s: %s", data_dir, exc)
+        removed = 0
+    if removed:
+        logging.info("Removed %d existing JSON files from %s", removed, data_dir)
+
+    logging.info("Processing %s", scac)
+    # Credentials travel with the call, never through os.environ, so several
+    # clients can be ingested by the same worker process at once.
+    await run_export_async(
+        scac, ENTITIES, weeks_ago=0, dry_run=False, output_dir=data_dir, credentials=creds
+    )
+    run_insert(scac, ENTITIES, dry_run=False, data_dir=data_dir)
+    # run_date comes from the orchestrator's replay-safe clock.
+    run_date = date.fromisoformat(params["run_date"]) if params.get("run_date") else None
+    await upload_weekly_json_async(scac, data_dir, run_date=run_date)
+    return scac
+
+
+def main(params: Dict[str, Any]) -> str:
+    try:
+        return asyncio.run(_amain(params))
     except Exception as err:  # pragma: no cover - notify and re-raise
         stack = traceback.format_exc()
         send_error_notification("ingest_client", str(err), stack)
         raise
-
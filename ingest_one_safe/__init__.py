@@ -0,0 +1,21 @@
+"""Sub-orchestrator running ``ingest_client`` for one SCAC without failing.
+
+``weekly_ingest`` fans these out with ``task_all``; a single raising task
+would fail the whole batch, so the outcome is returned instead.
+"""
+from typing import Any, Dict
+
+import azure.durable_functions as df
+
+
+def orchestrator_function(context: df.DurableOrchestrationContext):
+    payload: Dict[str, Any] = context.get_input()
+    scac = payload["scac"]
+    try:
+        yield context.call_activity("ingest_client", payload)
+        return {"scac": scac, "ok": True, "err": None}
+    except Exception as err:  # reported by the parent orchestrator
+        return {"scac": scac, "ok": False, "err": str(err)}
+
+
+main = df.Orchestrator.create(orchestrator_function)
@@ -1,4 +1,3 @@
-import pandas as pd
 import time
 from datetime import datetime
 from pathlib import Path
@@ -11,18 +10,20 @@ import db
 load_dotenv()
 
 # === Configuration ===
-# Database connection handled via db.get_conn()
-BATCH_SIZE = 500
+# Database connection handled via db.transaction()
+BATCH_SIZE = db.INSERT_BATCH_SIZE
+_EMPTY: Dict = {}  # shared stand-in for missing nested objects; never mutated
 
 def sanitize_driver(d: Dict) -> Dict:
+    fleet = d.get("Fleet") or _EMPTY
     return {
         "ID": d.get("Id"),
         "EMPLOYEE_ID": d.get("EmployeeId"),
         "DRIVER_TYPE": d.get("Type"),
         "SUBSIDIARY_ID": d.get("SubsidiaryId"),
-        "ZIP_CODE": d.get("Address", {}).get("ZipCode"),
-        "FLEET_ID": d.get("Fleet", {}).get("Id"),
-        "FLEET_NAME": d.get("Fleet", {}).get("Name"),
+        "ZIP_CODE": (d.get("Address") or _EMPTY).get("ZipCode"),
+        "FLEET_ID": fleet.get("Id"),
+        "FLEET_NAME": fleet.get("Name"),
         "CREATED_DTTM": safe_datetime(d.get("CreatedAt")),
         "IS_ACTIVE": int(d.get("IsActive", False)),
         "HIRED_DTTM": safe_datetime(d.get("HiredAt")),
@@ -30,19 +31,21 @@ def sanitize_driver(d: Dict) -> Dict:
     }
 
 def sanitize_truck(t: Dict) -> Dict:
+    fleet = t.get("Fleet") or _EMPTY
+    year = t.get("Year")
     return {
         "ID": t.get("Id"),
         "TRUCK_NUM": t.get("TruckNum"),
         "TRUCK_STATUS": t.get("Status"),
         "VIN_NUMBER": t.get("VinNumber"),
-        "YEAR": str(t.get("Year")) if t.get("Year") is not None else None,
+        "YEAR": str(year) if year is not None else None,
         "MAKE": t.get("Make"),
         "MODEL": t.get("Model"),
         "LICENSE_STATE": t.get("LicenseState"),
         "TRUCK_TYPE": t.get("TruckType"),
         "SUBSIDIARY_ID": t.get("SubsidiaryId"),
-        "FLEET_ID": t.get("Fleet", {}).get("Id"),
-        "FLEET_NAME": t.get("Fleet", {}).get("Name"),
+        "FLEET_ID": fleet.get("Id"),
+        "FLEET_NAME": fleet.get("Name"),
         "CREATED_DTTM": safe_datetime(t.get("CreatedAt")),
         "FILE_ID": t.get("FILE_ID")
     }
@@ -58,7 +61,8 @@ def sanitize_trailer(t: Dict) -> Dict:
     }
 
 def sanitize_customer(c: Dict) -> Dict:
-    billing = c.get("BillingAddress", {})
+    billing = c.get("BillingAddress") or _EMPTY
+    invoicing = c.get("InvoicingInformation") or _EMPTY
     return {
         "ID": c.get("Id"),
         "CUSTOMER_NAME": c.get("Name"),
@@ -69,8 +73,8 @@ def sanitize_customer(c: Dict) -> Dict:
         "CITY": billing.get("City"),
         "STATE_PROVINCE": billing.get("State"),
         "POSTAL_CD": billing.get("ZipCode"),
-        "INVOICING_NAME": c.get("InvoicingInformation", {}).get("InvoicingName"),
-        "INVOICING_ALIAS": c.get("InvoicingInformation", {}).get("InvoicingNameAlias"),
+        "INVOICING_NAME": invoicing.get("InvoicingName"),
+        "INVOICING_ALIAS": invoicing.get("InvoicingNameAlias"),
         "CREATED_DTTM": safe_datetime(c.get("DateCreated")),
         "FILE_ID": c.get("FILE_ID")
     }
@@ -100,25 +104,26 @@ def batch_insert(schema: str, table: str, records: List[Dict], conn):
         return
 
     inserted_dttm = datetime.now()
-    for rec in records:
-        rec["INSERTED_DTTM"] = inserted_dttm
 
-    df = pd.DataFrame(records)
-    columns = ", ".join(df.columns)
-    placeholders = ", ".join(["?" for _ in df.columns])
+    # Every sanitize_* dict has the same keys, so rows go straight to tuples
+    # without a DataFrame round-trip; missing values are already None.
+    # INSERTED_DTTM is appended per tuple instead of written into each record.
+    cols = list(records[0])
+    rows = [(*map(r.get, cols), inserted_dttm) for r in records]
+    cols.append("INSERTED_DTTM")
+    columns = ", ".join(cols)
+    placeholders = ", ".join(["?" for _ in cols])
     insert_sql = f"INSERT INTO {schema}.{table} ({columns}) VALUES ({placeholders})"
 
     cursor = conn.cursor()
     cursor.fast_executemany = True
     start = time.time()
-    for i in range(0, len(df), BATCH_SIZE):
-        batch = df.iloc[i:i + BATCH_SIZE].where(pd.notnull(df), None).values.tolist()
-        cursor.executemany(insert_sql, batch)
-    conn.commit()
+    for i in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(insert_sql, rows[i:i + BATCH_SIZE])
     duration = time.time() - start
-    print(f"OK Inserted {len(df)} records into {table} in {duration:.2f} seconds")
+    print(f"OK Inserted {len(rows)} records into {table} in {duration:.2f} seconds")
 
-def main(argv: List[str] | None = None, data_dir: Path | None = None):
+def main(argv: List[str] | None = None, data_dir: Path | None = None, conn=None):
     import argparse
 
     parser = argparse.ArgumentParser()
@@ -131,47 +136,48 @@ def main(argv: List[str] | None = None, data_dir: Path | None = None):
     schema = parsed.schema.upper()
     base_dir = Path(data_dir or Path("alvys_weekly_data") / schema)
 
-    conn = db.get_conn()
-
-    if run_all or "trailers" in args:
-        print("Loading trailers JSON...")
-        trailers = [
-            sanitize_trailer(t)
-            for t in load_json(base_dir / "TRAILERS.json")
-        ]
-        batch_insert(schema, "TRAILERS_RAW", trailers, conn)
-
-    if run_all or "trucks" in args:
-        print("Loading trucks JSON...")
-        trucks = [
-            sanitize_truck(t)
-            for t in load_json(base_dir / "TRUCKS.json")
-        ]
-        batch_insert(schema, "TRUCKS_RAW", trucks, conn)
-
-    if run_all or "drivers" in args:
-        print("Loading drivers JSON...")
-        drivers = [
-            sanitize_driver(d)
-            for d in load_json(base_dir / "DRIVERS.json")
-        ]
-        batch_insert(schema, "DRIVERS_RAW", drivers, conn)
-
-    if run_all or "customers" in args:
-        print("Loading customers JSON...")
-        customers = [
-            sanitize_customer(c)
-            for c in load_json(base_dir / "CUSTOMERS.json")
-        ]
-        batch_insert(schema, "CUSTOMERS_RAW", customers, conn)
-
-    if run_all or "carriers" in args:
-        print("Loading carriers JSON...")
-        raw = load_json(base_dir / "CARRIERS.json")
-        items = raw.get("Items") if isinstance(raw, dict) else raw
-        carriers = [sanitize_carrier(c) for c in items]
-        batch_insert(schema, "CARRIERS_RAW", carriers, conn)
-
+    # Every table goes in one transaction: a single commit (and log flush)
+    # at the end, and nothing half-loaded if a later table fails. Given
+    # ``conn``, the tables join the caller's transaction instead.
+    with db.transaction(conn) as conn:
+        if run_all or "trailers" in args:
+            print("Loading trailers JSON...")
+            trailers = [
+                sanitize_trailer(t)
+                for t in load_json(base_dir / "TRAILERS.json")
+            ]
+            batch_insert(schema, "TRAILERS_RAW", trailers, conn)
+
+        if run_all or "trucks" in args:
+            print("Loading trucks JSON...")
+            trucks = [
+                sanitize_truck(t)
+                for t in load_json(base_dir / "TRUCKS.json")
+            ]
+            batch_insert(schema, "TRUCKS_RAW", trucks, conn)
+
+        if run_all or "drivers" in args:
+            print("Loading drivers JSON...")
+            drivers = [
+                sanitize_driver(d)
+                for d in load_json(base_dir / "DRIVERS.json")
+            ]
+            batch_insert(schema, "DRIVERS_RAW", drivers, conn)
+
+        if run_all or "customers" in args:
+            print("Loading customers JSON...")
+            customers = [
+                sanitize_customer(c)
+                for c in load_json(base_dir / "CUSTOMERS.json")
+            ]
+            batch_insert(schema, "CUSTOMERS_RAW", customers, conn)
+
+        if run_all or "carriers" in args:
+            print("Loading carriers JSON...")
+            raw = load_json(base_dir / "CARRIERS.json")
+            items = raw.get("Items") if isinstance(raw, dict) else raw
+            carriers = [sanitize_carrier(c) for c in items]
+            batch_insert(schema, "CARRIERS_RAW", carriers, conn)
     print("\nOK All data inserted.")
 
 if __name__ == "__main__":
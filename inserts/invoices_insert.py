@@ -1,26 +1,39 @@
 """Insert Alvys invoice data into SQL Server (stable version)
 ----------------------------------------------------------------
 Adds **INSERTED_DTTM** audit column populated with the current UTC timestamp (`datetime2`) for every row in both tables.
-Uses ``db.get_engine()`` for connections.
+Uses ``db.transaction()`` for connections.
 
 Other fixes retained:
 * pyodbc `07002` workaround (no `method="multi"`).
 * Removed unsupported `executemany_mode`.
 * NaN/NaT -> `None` before upload.
+* Rows go to pyodbc `fast_executemany` via `db.fast_insert` instead of `DataFrame.to_sql`.
 """
-import os
 import json
 import time
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from itertools import chain
+from typing import BinaryIO, Iterator, List, Optional
 
 import pandas as pd
 from sqlalchemy import types
 from dotenv import load_dotenv  # type: ignore
 
+try:  # several times faster than the stdlib parser on these exports
+    import orjson
+except ImportError:  # pragma: no cover - fall back to stdlib json
+    orjson = None
+
+try:  # incremental parser: peak memory of one invoice instead of the file
+    import ijson
+except ImportError:  # pragma: no cover - fall back to a full parse
+    ijson = None
+
 import db
 from utils.datetime_utc import to_utc_naive
+from utils.io import export_files, file_pool
 
 load_dotenv()
 
@@ -28,10 +41,7 @@ load_dotenv()
 # CONFIG - customise per environment
 # --------------------------------------------
 
-CHUNK_SIZE = 1_000              # executemany batch size
-
-# One consistent timestamp per run
-RUN_TS = datetime.now(tz=timezone.utc).replace(tzinfo=None)  # naive UTC datetime (SQL Server datetime2)
+CHUNK_SIZE = db.INSERT_BATCH_SIZE  # executemany batch size
 
 # --------------------------------------------
 # COLUMN LISTS & SQL TYPES
@@ -42,6 +52,8 @@ INVOICE_COLS: List[str] = [
     "INSERTED_DTTM",
 ]
 
+INVOICE_DATETIME_COLS = ("CREATED_DTTM", "BILLED_DATE")
+
 LINE_ITEM_COLS: List[str] = [
     "ID", "INVOICE_ID", "INVOICE_NUMBER", "LINE_ITEM_NAME", "LINE_ITEM_AMOUNT",
     "LINE_ITEM_CURRENCY_CODE", "LINE_ITEM_RATE", "LINE_ITEM_UNITS", "LINE_ITEM_UNIT_TYPE",
@@ -81,93 +93,98 @@ DTYPE_LINE_ITEMS = {
 # DB ENGINE
 # --------------------------------------------
 
-# Database engine provided by db.get_engine()
+# Connections provided by db.transaction()
 
 # --------------------------------------------
 # HELPERS
 # --------------------------------------------
 
-def _s(val: Optional[str]) -> Optional[str]:
+_EMPTY: dict = {}  # stand-in for missing/null nested objects; never mutated
+
+
+def _s(val: Optional[str], max_len: int | None = None) -> Optional[str]:
+    """Trim to ``None`` when blank, truncating to ``max_len`` when given."""
     if val is None:
         return None
-    return str(val).strip() or None
-
+    s = str(val).strip()
+    if not s:
+        return None
+    return s[:max_len] if max_len else s
 
 
 # --------------------------------------------
 # FLATTENERS
 # --------------------------------------------
-
-def flatten_invoices(raw: list[dict], file_id: str) -> pd.DataFrame:
-    recs = []
-    for inv in raw:
-        recs.append([
-            _s(inv.get("Id"))[:100],
-            _s(inv.get("Number"))[:100],
-            _s(inv.get("Type"))[:50],
-            _s(inv.get("Status"))[:50],
-            inv.get("CreatedDate"),
-            inv.get("InvoicedDate"),
-            file_id[:50] if file_id else None,
-            _s(inv.get("Customer", {}).get("Id"))[:100],
-            float(inv.get("Total", {}).get("Amount") or 0),
-            RUN_TS,
+# Hot loops: attribute lookups and helpers are bound to locals once per call.
+
+def _invoice_row(inv: dict, fid: Optional[str], run_ts: datetime) -> list:
+    s, get = _s, inv.get
+    return [
+        s(get("Id"), 100),
+        s(get("Number"), 100),
+        s(get("Type"), 50),
+        s(get("Status"), 50),
+        get("CreatedDate"),
+        get("InvoicedDate"),
+        fid,
+        s((get("Customer") or _EMPTY).get("Id"), 100),
+        float((get("Total") or _EMPTY).get("Amount") or 0),
+        run_ts,
+    ]
+
+
+def _add_line_item_rows(recs: list, inv: dict, fid: Optional[str], run_ts: datetime) -> None:
+    s = _s
+    append = recs.append
+    inv_id = s(inv.get("Id"), 100)
+    inv_num = s(inv.get("Number"), 100)
+    for li in inv.get("LineItems") or ():
+        get = li.get
+        amount = get("Amount") or _EMPTY
+        currency = amount.get("Currency")
+        if isinstance(currency, dict):
+            currency_code = s(currency.get("Code"), 10)
+        else:
+            currency_code = s(currency, 10)
+
+        rate = get("Rate") or _EMPTY
+        units = rate.get("Units")
+        uom = rate.get("UnitOfMeasurement")
+        load_number = get("LoadNumber")
+        category = get("Category")
+        append([
+            s(get("Id"), 150),
+            inv_id,
+            inv_num,
+            s(get("Name"), 100),
+            float(amount.get("Amount") or 0),
+            currency_code,
+            float(rate.get("Rate") or 0),
+            s(units, 20) if units else None,
+            s(uom, 50) if uom else None,
+            s(load_number, 100) if load_number else None,
+            s(category, 50) if category else None,
+            fid,
+            run_ts,
         ])
-    df = pd.DataFrame(recs, columns=INVOICE_COLS)
-    df["CREATED_DTTM"] = to_utc_naive(df["CREATED_DTTM"])
-    df["BILLED_DATE"] = to_utc_naive(df["BILLED_DATE"])
-    return df
-
-
-def flatten_line_items(raw: list[dict], file_id: str) -> pd.DataFrame:
-    recs = []
-    for inv in raw:
-        inv_id = _s(inv.get("Id"))[:100]
-        inv_num = _s(inv.get("Number"))[:100]
-        for li in inv.get("LineItems", []):
-            currency = li.get("Amount", {}).get("Currency")
-            currency_code = None
-            if isinstance(currency, dict):
-                currency_code = _s(currency.get("Code"))[:10]
-            elif currency is not None:
-                currency_code = _s(currency)[:10]
-
-            rate = li.get("Rate", {})
-            recs.append([
-                _s(li.get("Id"))[:150],
-                inv_id,
-                inv_num,
-                _s(li.get("Name"))[:100],
-                float(li.get("Amount", {}).get("Amount") or 0),
-                currency_code,
-                float(rate.get("Rate") or 0),
-                _s(rate.get("Units"))[:20] if rate.get("Units") else None,
-                _s(rate.get("UnitOfMeasurement"))[:50] if rate.get("UnitOfMeasurement") else None,
-                _s(li.get("LoadNumber"))[:100] if li.get("LoadNumber") else None,
-                _s(li.get("Category"))[:50] if li.get("Category") else None,
-                file_id[:50] if file_id else None,
-                RUN_TS,
-            ])
-    return pd.DataFrame(recs, columns=LINE_ITEM_COLS)
+
 
 # --------------------------------------------
 # BULK INSERT
 # --------------------------------------------
 
-def bulk_insert(engine, schema: str, table: str, df: pd.DataFrame, dtypes: dict):
+def bulk_insert(
+    conn, schema: str, table: str, df: pd.DataFrame, dtypes: dict, chunk_size: int = CHUNK_SIZE
+):
     if df.empty:
         print(f"WARN  Nothing to insert into {table} - DataFrame empty.")
         return
-    df = df.where(pd.notnull(df), None)
     start = time.perf_counter()
-    df.to_sql(
-        name=table,
-        schema=schema,
-        con=engine,
-        if_exists="append",
-        index=False,
-        chunksize=CHUNK_SIZE,
-        dtype=dtypes,
+    rows = db.frame_rows(df)  # NaN/NaT -> None per column
+    cols = list(df.columns)
+    db.fast_insert(
+        conn, schema, table, cols, rows,
+        chunk_size=chunk_size, sizes=db.input_sizes(cols, dtypes),
     )
     dur = time.perf_counter() - start
     print(f"OK {len(df):,} rows inserted into {schema}.{table} in {dur:.1f}s")
@@ -176,7 +193,50 @@ def bulk_insert(engine, schema: str, table: str, df: pd.DataFrame, dtypes: dict)
 # MAIN
 # --------------------------------------------
 
-def main(argv: List[str] | None = None, data_dir: Path | None = None) -> None:
+def _now_utc() -> datetime:
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)  # naive UTC datetime (SQL Server datetime2)
+
+
+def _iter_invoices(f: BinaryIO) -> Iterator[dict]:
+    """Yield the invoices in an export file opened in binary mode.
+
+    With ``ijson`` the file is parsed incrementally, so only one invoice's
+    dict tree is alive at a time; otherwise the whole file is loaded.
+    Accepts a top-level array or an ``{"Items": [...]}`` envelope.
+    """
+    if ijson is not None:
+        prefix = "Items.item" if f.peek(64).lstrip()[:1] == b"{" else "item"
+        return ijson.items(f, prefix, use_float=True)
+    raw = f.read()
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    if isinstance(data, dict):
+        data = data.get("Items")
+    return iter(data or ())
+
+
+def _process_file(path: Path, run_ts: datetime) -> tuple[list[list], list[list]] | None:
+    """Parse one ``INVOICES_API_*.json`` file into invoice & line-item rows.
+
+    Both row sets are built in a single pass over the (streamed) invoices.
+    Frames are only built in :func:`main`, once per table across all files.
+    """
+    with open(path, "rb") as f:
+        invoices = _iter_invoices(f)
+        first = next(invoices, None)
+        if first is None:
+            return None
+        file_id = _s(first.get("FILE_ID"))
+        fid = file_id[:50] if file_id else None
+        invoice_rows: list[list] = []
+        line_item_rows: list[list] = []
+        for inv in chain((first,), invoices):
+            invoice_rows.append(_invoice_row(inv, fid, run_ts))
+            _add_line_item_rows(line_item_rows, inv, fid, run_ts)
+    print(f"Processing {path.name} ... {len(invoice_rows):,} objects (FILE_ID={file_id})")
+    return invoice_rows, line_item_rows
+
+
+def main(argv: List[str] | None = None, data_dir: Path | None = None, conn=None) -> None:
     import argparse
 
     parser = argparse.ArgumentParser()
@@ -185,33 +245,36 @@ def main(argv: List[str] | None = None, data_dir: Path | None = None) -> None:
     schema = args.schema.upper()
     base_dir = Path(data_dir or Path("alvys_weekly_data") / schema)
 
-    invoice_frames, line_item_frames = [], []
-
-    for fname in sorted(os.listdir(base_dir)):
-        if not (fname.startswith("INVOICES_API_") and fname.endswith(".json")):
-            continue
-        path = base_dir / fname
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-        if not data:
-            continue
-        file_id = _s(data[0].get("FILE_ID"))
-        print(f"Processing {fname} ... {len(data):,} objects (FILE_ID={file_id})")
-        invoice_frames.append(flatten_invoices(data, file_id))
-        line_item_frames.append(flatten_line_items(data, file_id))
-
-    invoices_df = (
-        pd.concat(invoice_frames, ignore_index=True) if invoice_frames else pd.DataFrame(columns=INVOICE_COLS)
-    )
-    line_items_df = (
-        pd.concat(line_item_frames, ignore_index=True) if line_item_frames else pd.DataFrame(columns=LINE_ITEM_COLS)
-    )
+    paths = export_files(base_dir, "INVOICES_API_")
+    # One consistent INSERTED_DTTM for every row of this run.
+    process = partial(_process_file, run_ts=_now_utc())
+    if len(paths) > 1:
+        # Files are independent: parse + flatten them on all cores.
+        with file_pool(len(paths)) as ex:
+            results = list(ex.map(process, paths))
+    else:
+        results = [process(path) for path in paths]
+
+    # Gather rows from every file and build each frame once: no per-file
+    # frames to infer dtypes for and no pd.concat copy afterwards.
+    invoice_rows: list[list] = []
+    line_item_rows: list[list] = []
+    for result in results:
+        if result is not None:
+            invoice_rows.extend(result[0])
+            line_item_rows.extend(result[1])
+
+    invoices_df = pd.DataFrame(invoice_rows, columns=INVOICE_COLS)
+    for col in INVOICE_DATETIME_COLS:
+        invoices_df[col] = to_utc_naive(invoices_df[col], format="ISO8601")
+    line_items_df = pd.DataFrame(line_item_rows, columns=LINE_ITEM_COLS)
 
     print(f"Found {len(invoices_df):,} invoices & {len(line_items_df):,} line items. Inserting ...")
 
-    engine = db.get_engine()
-    bulk_insert(engine, schema, "INVOICES_RAW", invoices_df, DTYPE_INVOICES)
-    bulk_insert(engine, schema, "INVOICE_LINE_ITEMS_RAW", line_items_df, DTYPE_LINE_ITEMS)
+    # Both tables commit together; ``conn`` joins run_insert's transaction.
+    with db.transaction(conn) as conn:
+        bulk_insert(conn, schema, "INVOICES_RAW", invoices_df, DTYPE_INVOICES)
+        bulk_insert(conn, schema, "INVOICE_LINE_ITEMS_RAW", line_items_df, DTYPE_LINE_ITEMS)
 
 
 if __name__ == "__main__":
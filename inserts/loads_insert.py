@@ -1,14 +1,14 @@
 """Insert Alvys load data into SQL Server efficiently
 ----------------------------------------------------
 Vectorised pandas -> SQL bulk load with audit column.
-Uses ``db.get_engine()`` for connections.
+Uses ``db.transaction()`` for connections.
 This revision fixes the `NoneType is not subscriptable` error by:
 * Introducing a **null-safe truncation helper** `_s(val, max_len)` and using it everywhere (no slicing outside `_s`).
-* Keeps single UTC `INSERTED_DTTM` for every row.
+* Keeps single UTC `INSERTED_DTTM` for every row (taken in `main` and passed down).
+* Rows go to pyodbc `fast_executemany` via `db.fast_insert` instead of `DataFrame.to_sql`.
 """
-import os
-import json
 import time
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional, Any
@@ -19,6 +19,7 @@ from dotenv import load_dotenv  # type: ignore
 
 import db
 from utils.datetime_utc import to_utc_naive
+from utils.io import export_files, file_pool, load_json
 
 load_dotenv()
 
@@ -26,8 +27,7 @@ load_dotenv()
 # CONFIG
 # --------------------------------------------
 
-CHUNK_SIZE = 1_000
-RUN_TS = datetime.now(tz=timezone.utc).replace(tzinfo=None)  # naive UTC timestamp
+CHUNK_SIZE = db.INSERT_BATCH_SIZE  # executemany batch size
 
 # --------------------------------------------
 # COLUMNS & SQL TYPES
@@ -77,7 +77,7 @@ DTYPE_LOADS = {
 # --------------------------------------------
 # ENGINE
 # --------------------------------------------
-# Database engine provided by db.get_engine()
+# Connections provided by db.transaction()
 
 # --------------------------------------------
 # HELPERS
@@ -100,65 +100,94 @@ def _f(val) -> Optional[float]:
         return None
 
 
-def g(d: Optional[dict], *keys):
-    for k in keys:
-        if not isinstance(d, dict):
-            return None
-        d = d.get(k)
-    return d
-
 # --------------------------------------------
 # FLATTEN ONE LOAD
 # --------------------------------------------
 
-def flatten_load(load: dict, file_id: str):
+_EMPTY: dict = {}  # stand-in for missing/non-dict nested objects; never mutated
+
+
+def flatten_load(load: dict, file_id: str, run_ts: datetime):
+    # Hot path: one call per load, so bind helpers/lookups locally and
+    # resolve each nested object once instead of walking a key path per field.
+    s, f, get = _s, _f, load.get
+    fleet = get("Fleet")
+    fleet = fleet if isinstance(fleet, dict) else _EMPTY
+    mileage = get("CustomerMileage")
+    mileage = mileage if isinstance(mileage, dict) else _EMPTY
+    distance = mileage.get("Distance")
+    distance = distance if isinstance(distance, dict) else _EMPTY
+    linehaul = get("Linehaul")
+    fuel = get("FuelSurcharge")
+    accessorials = get("CustomerAccessorials")
+    rate = get("CustomerRate")
+    weight = get("Weight")
     return [
-        _s(load.get("Id"), 100),
-        _s(load.get("LoadNumber"), 100),
-        _s(load.get("OrderNumber"), 100),
-        _s(load.get("Status"), 50),
-        _s(load.get("CustomerId"), 100),
-        _s(g(load, "Fleet", "Id"), 100),
-        _s(g(load, "Fleet", "Name"), 100),
-        _s(load.get("InvoiceAs"), 50),
-        _f(g(load, "Linehaul", "Amount")),
-        _f(g(load, "FuelSurcharge", "Amount")),
-        _f(g(load, "CustomerAccessorials", "Amount")),
-        _f(g(load, "CustomerRate", "Amount")),
-        _f(g(load, "CustomerMileage", "Distance", "Value")),
-        _s(g(load, "CustomerMileage", "Source"), 50),
-        _f(g(load, "Weight", "Value")),
-        load.get("ScheduledPickupAt"),
-        load.get("ScheduledDeliveryAt"),
-        load.get("PickedUpAt"),
-        load.get("DeliveredAt"),
-        load.get("CreatedAt"),
-        _s(load.get("CustomerServiceRepId"), 100),
-        _s(load.get("CustomerSalesAgentId"), 100),
-        load.get("UpdatedAt"),
-        int(load.get("IsDeleted") or False),
+        s(get("Id"), 100),
+        s(get("LoadNumber"), 100),
+        s(get("OrderNumber"), 100),
+        s(get("Status"), 50),
+        s(get("CustomerId"), 100),
+        s(fleet.get("Id"), 100),
+        s(fleet.get("Name"), 100),
+        s(get("InvoiceAs"), 50),
+        f(linehaul.get("Amount")) if isinstance(linehaul, dict) else None,
+        f(fuel.get("Amount")) if isinstance(fuel, dict) else None,
+        f(accessorials.get("Amount")) if isinstance(accessorials, dict) else None,
+        f(rate.get("Amount")) if isinstance(rate, dict) else None,
+        f(distance.get("Value")),
+        s(mileage.get("Source"), 50),
+        f(weight.get("Value")) if isinstance(weight, dict) else None,
+        get("ScheduledPickupAt"),
+        get("ScheduledDeliveryAt"),
+        get("PickedUpAt"),
+        get("DeliveredAt"),
+        get("CreatedAt"),
+        s(get("CustomerServiceRepId"), 100),
+        s(get("CustomerSalesAgentId"), 100),
+        get("UpdatedAt"),
+        int(get("IsDeleted") or False),
         file_id,  # already truncated to 50 below
-        RUN_TS,
-        _s(load.get("LoadType"), 50),
-        _s(load.get("CustomerNumber"), 100),
+        run_ts,
+        s(get("LoadType"), 50),
+        s(get("CustomerNumber"), 100),
     ]
 
 # --------------------------------------------
 # BUILD DATAFRAME
 # --------------------------------------------
 
-def build_dataframe(data_dir: Path) -> pd.DataFrame:
+def _now_utc() -> datetime:
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)  # naive UTC timestamp
+
+
+def _process_file(path: Path, run_ts: datetime) -> list[list]:
+    """Parse and flatten one ``LOADS_API_*.json`` file."""
+    data = load_json(path)
+    if not data:
+        return []
+    file_id = _s(data[0].get("FILE_ID"), 50)
+    print(f"Processing {path.name} ... {len(data):,} objects (FILE_ID={file_id})")
+    return [flatten_load(rec, file_id, run_ts) for rec in data]
+
+
+def build_dataframe(data_dir: Path, run_ts: datetime | None = None) -> pd.DataFrame:
+    """Return every load under ``data_dir`` as one DataFrame.
+
+    Every row is stamped with ``run_ts`` (default: now, UTC) as its
+    ``INSERTED_DTTM``.
+    """
+    paths = export_files(data_dir, "LOADS_API_")
+    process = partial(_process_file, run_ts=run_ts or _now_utc())
     rows: list[list] = []
-    for fname in sorted(os.listdir(data_dir)):
-        if not fname.startswith("LOADS_API_") or not fname.endswith(".json"):
-            continue
-        with open(data_dir / fname, encoding="utf-8") as f:
-            data = json.load(f)
-        if not data:
-            continue
-        file_id = _s(data[0].get("FILE_ID"), 50)
-        print(f"Processing {fname} ... {len(data):,} objects (FILE_ID={file_id})")
-        rows.extend(flatten_load(rec, file_id) for rec in data)
+    if len(paths) > 1:
+        # Files are independent: parse + flatten them on all cores.
+        with file_pool(len(paths)) as ex:
+            for file_rows in ex.map(process, paths):
+                rows.extend(file_rows)
+    else:
+        for path in paths:
+            rows.extend(process(path))
 
     df = pd.DataFrame(rows, columns=LOAD_COLS)
 
@@ -167,28 +196,24 @@ def build_dataframe(data_dir: Path) -> pd.DataFrame:
         "SCHEDULED_PICKUP", "SCHEDULED_DELIVERY", "PICKED_UP_AT", "DELIVERED_AT",
         "CREATED_DTTM", "UPDATED_DTTM",
     ]:
-        df[col] = to_utc_naive(df[col])
+        df[col] = to_utc_naive(df[col], format="ISO8601")
     return df
 
 # --------------------------------------------
 # BULK INSERT
 # --------------------------------------------
 
-def bulk_insert(engine, schema: str, df: pd.DataFrame):
+def bulk_insert(conn, schema: str, df: pd.DataFrame, chunk_size: int = CHUNK_SIZE):
     if df.empty:
         print("WARN  No load records to insert.")
         return
-    df = df.where(pd.notnull(df), None)
     start = time.perf_counter()
     table = "LOADS_RAW"
-    df.to_sql(
-        name=table,
-        schema=schema,
-        con=engine,
-        if_exists="append",
-        index=False,
-        chunksize=CHUNK_SIZE,
-        dtype=DTYPE_LOADS,
+    rows = db.frame_rows(df)  # NaN/NaT -> None per column
+    cols = list(df.columns)
+    db.fast_insert(
+        conn, schema, table, cols, rows,
+        chunk_size=chunk_size, sizes=db.input_sizes(cols, DTYPE_LOADS),
     )
     print(f"OK {len(df):,} rows inserted into {schema}.{table} in {time.perf_counter() - start:.1f}s")
 
@@ -196,7 +221,7 @@ def bulk_insert(engine, schema: str, df: pd.DataFrame):
 # MAIN
 # --------------------------------------------
 
-def main(argv: List[str] | None = None, data_dir: Path | None = None):
+def main(argv: List[str] | None = None, data_dir: Path | None = None, conn=None):
     import argparse
 
     parser = argparse.ArgumentParser()
@@ -206,9 +231,12 @@ def main(argv: List[str] | None = None, data_dir: Path | None = None):
     base_dir = Path(data_dir or Path("alvys_weekly_data") / schema)
 
     print("Loading loads JSON ...")
-    df = build_dataframe(base_dir)
+    run_ts = _now_utc()  # one INSERTED_DTTM for every row of this run
+    df = build_dataframe(base_dir, run_ts)
     print(f"Found {len(df):,} loads. Inserting ...")
-    bulk_insert(db.get_engine(), schema, df)
+    # ``conn`` lets run_insert load every table in one transaction.
+    with db.transaction(conn) as conn:
+        bulk_insert(conn, schema, df)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,19 @@
 """Insert Alvys trip & stop data into SQL Server efficiently
 ---------------------------------------------------------
-* Vectorised pandas bulk-insert (`fast_executemany=True`).
-* Adds `INSERTED_DTTM` audit column (single UTC timestamp per run).
+* Streams file by file into pyodbc `fast_executemany` cursors (one transaction for both tables,
+  or the caller's when `main` is given a connection),
+  so only one export file's rows are held in memory at a time.
+* Adds `INSERTED_DTTM` audit column (single UTC timestamp per run, taken in `main` and passed down).
 * Null-safe helpers prevent slicing errors.
-* Uses ``db.get_engine()`` for connections.
+* Uses ``db.transaction()`` for connections.
 """
 import os
-import json
 import time
+from functools import partial
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import Iterator, List, Optional, Any
 
 import pandas as pd
 from sqlalchemy import types
@@ -18,6 +21,7 @@ from dotenv import load_dotenv  # type: ignore
 
 import db
 from utils.datetime_utc import to_utc_naive
+from utils.io import export_files, file_pool, load_json
 
 load_dotenv()
 
@@ -25,8 +29,7 @@ load_dotenv()
 # CONFIG
 # --------------------------------------------
 
-CHUNK_SIZE = 1_000
-RUN_TS = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+CHUNK_SIZE = db.INSERT_BATCH_SIZE  # executemany batch size
 
 # --------------------------------------------
 # COLUMNS & DTYPES
@@ -53,6 +56,14 @@ STOP_COLS: List[str] = [
     "ARRIVED_DTTM", "DEPARTED_DTTM", "FILE_ID", "INSERTED_DTTM", "LOC_ID", "LOC_NAME",
 ]
 
+TRIP_DATETIME_COLS = (
+    "PICKUP_DTTM", "DELIVERY_DTTM", "PICKED_UP_DTTM", "DELIVERED_DTTM",
+    "CARRIER_ASSIGNED_DTTM", "RELEASED_DTTM", "UPDATED_DTTM",
+)
+STOP_DATETIME_COLS = (
+    "EARLIEST_APPOINTMENT_DTTM", "LATEST_APPOINTMENT_DTTM", "ARRIVED_DTTM", "DEPARTED_DTTM",
+)
+
 # NOTE: Many VARCHAR lengths chosen generically; adjust if DB schema differs.
 NUM18_2 = types.Numeric(18, 2)
 NUM18_6 = types.Numeric(18, 6)
@@ -133,7 +144,7 @@ DTYPE_STOPS = {
 # ENGINE
 # --------------------------------------------
 
-# Database engine provided by db.get_engine()
+# Connections provided by db.transaction()
 
 # --------------------------------------------
 # HELPERS
@@ -154,102 +165,116 @@ def _f(val) -> Optional[float]:
     except (TypeError, ValueError):
         return None
 
-
-def g(d: Optional[dict], *keys):
-    for k in keys:
-        if not isinstance(d, dict):
-            return None
-        d = d.get(k)
-    return d
-
 # --------------------------------------------
 # FLATTENERS
 # --------------------------------------------
 
-def flatten_trip(trip: dict, file_id: str):
+_EMPTY: dict = {}  # stand-in for missing/non-dict nested objects; never mutated
+
+
+def _obj(val) -> dict:
+    return val if isinstance(val, dict) else _EMPTY
+
+
+def flatten_trip(trip: dict, file_id: str, run_ts: datetime):
+    # Hot path: one call per trip, so bind helpers/lookups locally and
+    # resolve each nested object once instead of walking it via ``g``.
+    s, f, get = _s, _f, trip.get
+    total = _obj(get("TotalMileage"))
+    truck = _obj(get("Truck"))
+    truck_fleet = _obj(truck.get("Fleet"))
+    trailer = _obj(get("Trailer"))
+    driver1 = _obj(get("Driver1"))
+    driver2 = _obj(get("Driver2"))
+    carrier = _obj(get("Carrier"))
     return [
-        _s(trip.get("Id"), 100),
-        _s(trip.get("TripNumber"), 100),
-        _s(trip.get("Status"), 50),
-        _s(trip.get("LoadNumber"), 100),
-        _s(trip.get("TenderAs"), 50),
-        _f(g(trip, "TotalMileage", "Distance", "Value")),
-        _s(g(trip, "TotalMileage", "Source"), 50),
-        _s(g(trip, "TotalMileage", "ProfileName"), 100),
-        _f(g(trip, "EmptyMileage", "Distance", "Value")),
-        _f(g(trip, "LoadedMileage", "Distance", "Value")),
-        trip.get("PickupDate"),
-        trip.get("DeliveryDate"),
-        trip.get("PickedUpAt"),
-        trip.get("DeliveredAt"),
-        trip.get("CarrierAssignedAt"),
-        trip.get("ReleasedAt"),
-        _f(g(trip, "TripValue", "Amount")),
-        _s(g(trip, "Truck", "Id"), 100),
-        _s(g(trip, "Truck", "Fleet", "Id"), 100),
-        _s(g(trip, "Truck", "Fleet", "Name"), 100),
-        _s(g(trip, "Trailer", "Id"), 100),
-        _s(g(trip, "Trailer", "EquipmentType"), 50),
-        _s(g(trip, "Driver1", "Id"), 100),
-        _s(g(trip, "Driver1", "ContractorType"), 50),
-        _s(g(trip, "Driver1", "Fleet", "Id"), 100),
-        _s(g(trip, "Driver2", "Id"), 100),
-        _s(g(trip, "Driver2", "ContractorType"), 50),
-        _s(g(trip, "Driver2", "Fleet", "Id"), 100),
-        _s(g(trip, "OwnerOperator", "Id"), 100),
-        _s(trip.get("ReleasedBy"), 100),
-        _s(trip.get("DispatchedBy"), 100),
-        _s(trip.get("DispatcherId"), 100),
-        int(trip.get("CarrierPayOnHold") or False),
-        _s(g(trip, "Carrier", "Id"), 100),
-        _s(g(trip, "Carrier", "CarrierInvoiceNumber"), 100),
-        _f(g(trip, "Carrier", "Rate", "Amount")),
-        _f(g(trip, "Carrier", "Linehaul", "Amount")),
-        _f(g(trip, "Carrier", "Fuel", "Amount")),
-        _f(g(trip, "Carrier", "Accessorials", "Amount")),
-        _f(g(trip, "Carrier", "TotalPayable", "Amount")),
-        trip.get("UpdatedAt"),
-        int(trip.get("IsDeleted") or False),
+        s(get("Id"), 100),
+        s(get("TripNumber"), 100),
+        s(get("Status"), 50),
+        s(get("LoadNumber"), 100),
+        s(get("TenderAs"), 50),
+        f(_obj(total.get("Distance")).get("Value")),
+        s(total.get("Source"), 50),
+        s(total.get("ProfileName"), 100),
+        f(_obj(_obj(get("EmptyMileage")).get("Distance")).get("Value")),
+        f(_obj(_obj(get("LoadedMileage")).get("Distance")).get("Value")),
+        get("PickupDate"),
+        get("DeliveryDate"),
+        get("PickedUpAt"),
+        get("DeliveredAt"),
+        get("CarrierAssignedAt"),
+        get("ReleasedAt"),
+        f(_obj(get("TripValue")).get("Amount")),
+        s(truck.get("Id"), 100),
+        s(truck_fleet.get("Id"), 100),
+        s(truck_fleet.get("Name"), 100),
+        s(trailer.get("Id"), 100),
+        s(trailer.get("EquipmentType"), 50),
+        s(driver1.get("Id"), 100),
+        s(driver1.get("ContractorType"), 50),
+        s(_obj(driver1.get("Fleet")).get("Id"), 100),
+        s(driver2.get("Id"), 100),
+        s(driver2.get("ContractorType"), 50),
+        s(_obj(driver2.get("Fleet")).get("Id"), 100),
+        s(_obj(get("OwnerOperator")).get("Id"), 100),
+        s(get("ReleasedBy"), 100),
+        s(get("DispatchedBy"), 100),
+        s(get("DispatcherId"), 100),
+        int(get("CarrierPayOnHold") or False),
+        s(carrier.get("Id"), 100),
+        s(carrier.get("CarrierInvoiceNumber"), 100),
+        f(_obj(carrier.get("Rate")).get("Amount")),
+        f(_obj(carrier.get("Linehaul")).get("Amount")),
+        f(_obj(carrier.get("Fuel")).get("Amount")),
+        f(_obj(carrier.get("Accessorials")).get("Amount")),
+        f(_obj(carrier.get("TotalPayable")).get("Amount")),
+        get("UpdatedAt"),
+        int(get("IsDeleted") or False),
         file_id,
-        RUN_TS,
+        run_ts,
     ]
 
 
-def flatten_stops(trip: dict, file_id: str):
-    trip_id = _s(trip.get("Id"), 100)
-    trip_num = _s(trip.get("TripNumber"), 100)
+def flatten_stops(trip: dict, file_id: str, run_ts: datetime):
+    raw_stops = trip.get("Stops")
+    if not raw_stops:
+        return []
+    s, f, obj = _s, _f, _obj
+    trip_id = s(trip.get("Id"), 100)
+    trip_num = s(trip.get("TripNumber"), 100)
     stops = []
-    for seq, stop in enumerate(trip.get("Stops", []), 1):
-        address = stop.get("Address", {})
-        coords = stop.get("Coordinates", {})
+    append = stops.append
+    for seq, stop in enumerate(raw_stops, 1):
+        get = stop.get
+        address = obj(get("Address"))
+        coords = obj(get("Coordinates"))
         # Determine appointment window fields
-        earliest = stop.get("AppointmentDate") or g(stop, "StopWindow", "Begin")
-        latest = g(stop, "StopWindow", "End") if stop.get("StopWindow") else None
-        stops.append([
-            _s(stop.get("Id") or f"{trip_id}_{seq}", 100),
+        window = obj(get("StopWindow"))
+        append([
+            s(get("Id") or f"{trip_id}_{seq}", 100),
             trip_id,
             trip_num,
             seq,
-            int(stop.get("AppointmentRequested") or False),
-            int(stop.get("AppointmentConfirmed") or False),
-            earliest,
-            latest,
-            _s(address.get("Street"), 200),
-            _s(address.get("City"), 100),
-            _s(address.get("State"), 50),
-            _s(address.get("ZipCode"), 20),
-            _f(coords.get("Latitude")),
-            _f(coords.get("Longitude")),
-            _s(stop.get("Status"), 50),
-            _s(stop.get("StopType"), 50),
-            _s(stop.get("ScheduleType"), 50),
-            _s(stop.get("LoadingType"), 50),
-            stop.get("ArrivedAt"),
-            stop.get("DepartedAt"),
+            int(get("AppointmentRequested") or False),
+            int(get("AppointmentConfirmed") or False),
+            get("AppointmentDate") or window.get("Begin"),
+            window.get("End"),
+            s(address.get("Street"), 200),
+            s(address.get("City"), 100),
+            s(address.get("State"), 50),
+            s(address.get("ZipCode"), 20),
+            f(coords.get("Latitude")),
+            f(coords.get("Longitude")),
+            s(get("Status"), 50),
+            s(get("StopType"), 50),
+            s(get("ScheduleType"), 50),
+            s(get("LoadingType"), 50),
+            get("ArrivedAt"),
+            get("DepartedAt"),
             file_id,
-            RUN_TS,
-            _s(stop.get("CompanyNumber"), 100),
-            _s(stop.get("CompanyName"), 200),
+            run_ts,
+            s(get("CompanyNumber"), 100),
+            s(get("CompanyName"), 200),
         ])
     return stops
 
@@ -257,65 +282,133 @@ def flatten_stops(trip: dict, file_id: str):
 # BUILD DATAFRAMES
 # --------------------------------------------
 
-def build_dfs(data_dir: Path):
+def _now_utc() -> datetime:
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None)  # naive UTC (datetime2)
+
+
+def _trip_key(row: list) -> str:
+    return row[0] or ""  # ID
+
+
+def _stop_key(row: list) -> tuple:
+    return row[1] or "", row[3]  # TRIP_ID, STOP_SEQUENCE
+
+
+def _process_file(path: Path, run_ts: datetime) -> tuple[list[list], list[list]]:
+    """Parse one ``TRIPS_API_*.json`` file into trip & stop rows.
+
+    FILE_ID is constant per file, so sorting by ID (trips) and by
+    TRIP_ID, STOP_SEQUENCE (stops) hands SQL Server rows in key order,
+    assuming the RAW tables are clustered on those columns; inserts then
+    append to the index instead of splitting pages at random.
+    """
+    data = load_json(path)
+    if not data:
+        return [], []
+    file_id = _s(data[0].get("FILE_ID"), 50)
+    print(f"Processing {path.name} ... {len(data):,} objects (FILE_ID={file_id})")
     trip_rows: list[list] = []
     stop_rows: list[list] = []
-    for fname in sorted(os.listdir(data_dir)):
-        if not fname.startswith("TRIPS_API_") or not fname.endswith(".json"):
-            continue
-        with open(data_dir / fname, encoding="utf-8") as f:
-            data = json.load(f)
-        if not data:
-            continue
-        file_id = _s(data[0].get("FILE_ID"), 50)
-        print(f"Processing {fname} ... {len(data):,} objects (FILE_ID={file_id})")
-        for trip in data:
-            trip_rows.append(flatten_trip(trip, file_id))
-            stop_rows.extend(flatten_stops(trip, file_id))
-
+    for trip in data:
+        trip_rows.append(flatten_trip(trip, file_id, run_ts))
+        stop_rows.extend(flatten_stops(trip, file_id, run_ts))
+    trip_rows.sort(key=_trip_key)
+    stop_rows.sort(key=_stop_key)
+    return trip_rows, stop_rows
+
+
+def _iter_file_rows(
+    paths: List[Path], run_ts: datetime
+) -> Iterator[tuple[list[list], list[list]]]:
+    """Yield ``(trip_rows, stop_rows)`` per export file, in file order.
+
+    Every row is stamped with ``run_ts`` as its ``INSERTED_DTTM``.
+
+    With several files they are parsed on a process pool, but at most one
+    file per worker is in flight so finished rows never pile up faster
+    than the caller consumes them.
+    """
+    process = partial(_process_file, run_ts=run_ts)
+    if len(paths) <= 1:
+        for path in paths:
+            yield process(path)
+        return
+    # Files are independent: parse + flatten them on all cores.
+    workers = min(len(paths), os.cpu_count() or 1)  # file_pool's size
+    with file_pool(len(paths)) as ex:
+        pending: deque = deque()
+        for path in paths:
+            pending.append(ex.submit(process, path))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _frames(trip_rows: list[list], stop_rows: list[list]) -> tuple[pd.DataFrame, pd.DataFrame]:
     trips_df = pd.DataFrame(trip_rows, columns=TRIP_COLS)
     stops_df = pd.DataFrame(stop_rows, columns=STOP_COLS)
 
     # Parse datetime columns
-    datetime_trip_cols = [
-        "PICKUP_DTTM", "DELIVERY_DTTM", "PICKED_UP_DTTM", "DELIVERED_DTTM",
-        "CARRIER_ASSIGNED_DTTM", "RELEASED_DTTM", "UPDATED_DTTM",
-    ]
-    trips_df[datetime_trip_cols] = trips_df[datetime_trip_cols].apply(to_utc_naive)
-
-    datetime_stop_cols = [
-        "EARLIEST_APPOINTMENT_DTTM", "LATEST_APPOINTMENT_DTTM", "ARRIVED_DTTM", "DEPARTED_DTTM",
-    ]
-    stops_df[datetime_stop_cols] = stops_df[datetime_stop_cols].apply(to_utc_naive)
+    for col in TRIP_DATETIME_COLS:
+        trips_df[col] = to_utc_naive(trips_df[col], format="ISO8601")
+    for col in STOP_DATETIME_COLS:
+        stops_df[col] = to_utc_naive(stops_df[col], format="ISO8601")
 
     return trips_df, stops_df
 
+
+def build_dfs(data_dir: Path, run_ts: datetime | None = None):
+    """Return all trips & stops under ``data_dir`` as two DataFrames.
+
+    ``run_ts`` defaults to the current UTC time.
+
+    Holds every file in memory; :func:`insert_stream` is what ``main`` uses.
+    """
+    trip_rows: list[list] = []
+    stop_rows: list[list] = []
+    paths = export_files(data_dir, "TRIPS_API_")
+    for trips, stops in _iter_file_rows(paths, run_ts or _now_utc()):
+        trip_rows.extend(trips)
+        stop_rows.extend(stops)
+    return _frames(trip_rows, stop_rows)
+
 # --------------------------------------------
 # BULK INSERT
 # --------------------------------------------
 
-def bulk_insert(engine, schema: str, table: str, df: pd.DataFrame, dtype_map: dict):
-    if df.empty:
-        print(f"WARN  No records for {table}.")
-        return
-    df = df.where(pd.notnull(df), None)
-    start = time.perf_counter()
-    df.to_sql(
-        name=table,
-        schema=schema,
-        con=engine,
-        if_exists="append",
-        index=False,
-        chunksize=CHUNK_SIZE,
-        dtype=dtype_map,
-    )
-    print(f"OK {len(df):,} rows inserted into {schema}.{table} in {time.perf_counter() - start:.1f}s")
+def insert_stream(
+    conn, schema: str, paths: List[Path], run_ts: datetime, chunk_size: int = CHUNK_SIZE
+) -> tuple[int, int]:
+    """Insert trips & stops from ``paths`` one file at a time.
+
+    Each file's rows go straight to two ``fast_executemany`` cursors on the
+    DBAPI connection ``conn``; nothing is committed here, so the caller's
+    transaction (see :func:`db.transaction`) covers both tables. Returns
+    ``(trips, stops)`` counts.
+    """
+    trip_sql = db.insert_sql(schema, "TRIPS_RAW", TRIP_COLS)
+    stop_sql = db.insert_sql(schema, "TRIP_STOPS_RAW", STOP_COLS)
+    n_trips = n_stops = 0
+    trip_cur = db.bulk_cursor(conn, db.input_sizes(TRIP_COLS, DTYPE_TRIPS))
+    stop_cur = db.bulk_cursor(conn, db.input_sizes(STOP_COLS, DTYPE_STOPS))
+    for trip_rows, stop_rows in _iter_file_rows(paths, run_ts):
+        if not trip_rows:
+            continue
+        trips_df, stops_df = _frames(trip_rows, stop_rows)
+        del trip_rows, stop_rows
+        db.executemany_batches(trip_cur, trip_sql, db.frame_rows(trips_df), chunk_size)
+        if not stops_df.empty:
+            db.executemany_batches(stop_cur, stop_sql, db.frame_rows(stops_df), chunk_size)
+        n_trips += len(trips_df)
+        n_stops += len(stops_df)
+    return n_trips, n_stops
 
 # --------------------------------------------
 # MAIN
 # --------------------------------------------
 
-def main(argv: List[str] | None = None, data_dir: Path | None = None):
+def main(argv: List[str] | None = None, data_dir: Path | None = None, conn=None):
     import argparse
 
     parser = argparse.ArgumentParser()
@@ -324,11 +417,19 @@ def main(argv: List[str] | None = None, data_dir: Path | None = None):
     schema = args.schema.upper()
     base_dir = Path(data_dir or Path("alvys_weekly_data") / schema)
 
-    trips_df, stops_df = build_dfs(base_dir)
-    print(f"Found {len(trips_df):,} trips & {len(stops_df):,} stops. Inserting ...")
-    eng = db.get_engine()
-    bulk_insert(eng, schema, "TRIPS_RAW", trips_df, DTYPE_TRIPS)
-    bulk_insert(eng, schema, "TRIP_STOPS_RAW", stops_df, DTYPE_STOPS)
+    paths = export_files(base_dir, "TRIPS_API_")
+    if not paths:
+        print("WARN  No trip export files found.")
+        return
+    start = time.perf_counter()
+    run_ts = _now_utc()  # one INSERTED_DTTM for every row of this run
+    # ``conn`` lets run_insert load every table in one transaction.
+    with db.transaction(conn) as conn:
+        n_trips, n_stops = insert_stream(conn, schema, paths, run_ts)
+    print(
+        f"OK {n_trips:,} trips & {n_stops:,} stops inserted into {schema} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
 
 
 if __name__ == "__main__":
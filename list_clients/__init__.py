@@ -5,8 +5,11 @@ import traceback
 import db
 from utils.alerts import send_error_notification
 
+# Credential columns in SELECT order, under the keys alvys_export expects.
+_CREDENTIAL_KEYS = ("tenant_id", "client_id", "client_secret", "grant_type")
 
-def main(input: Any) -> List[Dict[str, str]]:
+
+def main(input: Any) -> List[Dict[str, Any]]:
     try:
         query = (
             "SELECT SCAC, TENANT_ID, CLIENT_ID, CLIENT_SECRET, GRANT_TYPE "
@@ -14,18 +17,13 @@ def main(input: Any) -> List[Dict[str, str]]:
         )
         with db.get_conn() as conn, conn.cursor() as cur:
             cur.execute(query)
-            rows = cur.fetchall()
-        # return a list of dicts with consistent keys the orchestrator expects
-        return [
-            {
-                "SCAC": r[0],
-                "TENANT_ID": r[1],
-                "CLIENT_ID": r[2],
-                "CLIENT_SECRET": r[3],
-                "GRANT_TYPE": r[4],
-            }
-            for r in rows
-        ]
+            # Rows come back already shaped like the ingest_client payload,
+            # so the orchestrator forwards them instead of rebuilding each
+            # dict; iterating the cursor avoids an intermediate fetchall().
+            return [
+                {"scac": r[0], "credentials": dict(zip(_CREDENTIAL_KEYS, r[1:]))}
+                for r in cur
+            ]
     except Exception as err:  # pragma: no cover - notify and re-raise
         stack = traceback.format_exc()
         send_error_notification("list_clients", str(err), stack)
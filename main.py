@@ -21,12 +21,13 @@ Key design points
 from __future__ import annotations
 
 import argparse
+import asyncio
 import importlib
 import os
 import sys
 from dotenv import load_dotenv  # type: ignore
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Mapping
 
 
 load_dotenv()
@@ -121,17 +122,24 @@ def normalise(entity_args: Iterable[str]) -> List[str]:
 # EXPORT LOGIC
 # --------------------------------------------
 
-def run_export(
+async def run_export_async(
     scac: str,
     entities: List[str],
     weeks_ago: int,
     dry_run: bool,
     output_dir: Path | None = None,
+    credentials: Mapping[str, str] | None = None,
 ) -> None:
+    """Export ``entities`` for ``scac``.
+
+    ``credentials`` short-circuits :func:`config.get_credentials`; callers that
+    already hold the client's creds (e.g. the ``ingest_client`` activity) pass
+    them here instead of exporting them through ``os.environ``.
+    """
     start, end = get_last_week_range(weeks_ago)
     print(start)
     print(end)
-    creds = get_credentials(scac)
+    creds = credentials or get_credentials(scac)
 
     out_dir = output_dir or DATA_DIR / scac.upper()
 
@@ -151,15 +159,28 @@ def run_export(
         return
 
     # Heavy dependency import only when needed
-    from alvys_export import export_endpoints  # type: ignore  # noqa: WPS433
+    from alvys_export import export_endpoints_async  # type: ignore  # noqa: WPS433
 
-    export_endpoints(
+    await export_endpoints_async(
         entities=entities,
         credentials=creds,
         date_range=(start, end),
         output_dir=out_dir,
     )
 
+
+def run_export(
+    scac: str,
+    entities: List[str],
+    weeks_ago: int,
+    dry_run: bool,
+    output_dir: Path | None = None,
+    credentials: Mapping[str, str] | None = None,
+) -> None:
+    asyncio.run(
+        run_export_async(scac, entities, weeks_ago, dry_run, output_dir, credentials)
+    )
+
 # --------------------------------------------
 # INSERT LOGIC
 # --------------------------------------------
@@ -178,25 +199,30 @@ def run_insert(
         print("[DRY-RUN] Would insert:", entities, "into schema", schema, "from", dir_path)
         return
 
-    for ent in entities:
-        # 1)  Route active entities to active_entities_insert.py
-        if ent in ACTIVE_ENTS:
-            print(f"-> inserting {ent.upper()} ...")
-            aei.main([ent, "--scac", scac], data_dir=dir_path)
-            continue
-
-        # 2)  Loads, trips, invoices use their dedicated modules
-        mod_name = f"inserts.{ent}_insert"
-        try:
-            mod = importlib.import_module(mod_name)
-        except ModuleNotFoundError as exc:
-            sys.exit(f"X Insert module not found: {mod_name} -> {exc}")
+    # One transaction per client: every loader writes through the same
+    # connection, so a failure in any table leaves none of them committed.
+    active = [ent for ent in entities if ent in ACTIVE_ENTS]
+    with db.transaction() as conn:
+        # 1)  Loads, trips, invoices use their dedicated modules
+        for ent in entities:
+            if ent in ACTIVE_ENTS:
+                continue
+            mod_name = f"inserts.{ent}_insert"
+            try:
+                mod = importlib.import_module(mod_name)
+            except ModuleNotFoundError as exc:
+                sys.exit(f"X Insert module not found: {mod_name} -> {exc}")
+
+            if not hasattr(mod, "main"):
+                sys.exit(f"X {mod_name} lacks a main() entry-point")
 
-        if not hasattr(mod, "main"):
-            sys.exit(f"X {mod_name} lacks a main() entry-point")
+            print(f"-> inserting {ent.upper()} ...")
+            mod.main(["--scac", scac], data_dir=dir_path, conn=conn)
 
-        print(f"-> inserting {ent.upper()} ...")
-        mod.main(["--scac", scac], data_dir=dir_path)
+        # 2)  Active entities go to active_entities_insert.py in one call
+        if active:
+            print(f"-> inserting {', '.join(ent.upper() for ent in active)} ...")
+            aei.main([*active, "--scac", scac], data_dir=dir_path, conn=conn)
 
     if insert_upload_id:
         db.exec_client_upload_id(scac)
@@ -0,0 +1,18 @@
+"""Activity to record this week's upload id for every ingested SCAC."""
+import logging
+from typing import List
+
+import db
+
+
+def main(scacs: List[str]) -> int:
+    # The data is already loaded by now, so a failure here must not fail the
+    # weekly run. exec_client_upload_ids has sent the error notification
+    # before re-raising; log and report that nothing was recorded.
+    scacs = scacs or []
+    try:
+        db.exec_client_upload_ids(scacs)
+    except Exception:
+        logging.exception("Recording upload ids failed for %s", ", ".join(scacs))
+        return 0
+    return len(scacs)
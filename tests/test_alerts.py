@@ -1,21 +1,27 @@
 import os
+import sys
 import uuid
 from pathlib import Path
-import importlib.util
+import importlib
 from unittest.mock import patch
 import pytest # type: ignore
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
-def _load_alerts_module():
-    module_path = Path(__file__).resolve().parents[1] / "utils" / "alerts.py"
-    spec = importlib.util.spec_from_file_location("alerts", str(module_path))
-    mod = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    spec.loader.exec_module(mod)
-    return mod
 
+@pytest.fixture
+def alerts():
+    # Import once and share; only the cached Flow URL is reset so each test
+    # sees the ERROR_FLOW_URL it sets.
+    mod = importlib.import_module("utils.alerts")
+    mod._get_flow_url.cache_clear()
+    yield mod
+    mod._get_flow_url.cache_clear()
 
-def test_send_error_notification_posts_payload_unit():
+
+def test_send_error_notification_posts_payload_unit(alerts):
     captured = {}
 
     def fake_post(url, json=None, timeout=None):
@@ -36,9 +42,8 @@ def test_send_error_notification_posts_payload_unit():
     )
 
     with patch.dict(os.environ, {"ERROR_FLOW_URL": flow_url}, clear=False), \
-         patch("requests.post", side_effect=fake_post), \
+         patch.object(alerts._SESSION, "post", side_effect=fake_post), \
          patch("uuid.uuid4", return_value=uuid.UUID("12345678-1234-5678-1234-567812345678")):
-        alerts = _load_alerts_module()
         status, body = alerts.send_error_notification("func", "message", "trace")
 
     assert captured["url"] == flow_url
@@ -58,12 +63,11 @@ def test_send_error_notification_posts_payload_unit():
     os.getenv("RUN_LIVE_FLOW_TEST") != "1",
     reason="Set RUN_LIVE_FLOW_TEST=1 to run the live Flow trigger test."
 )
-def test_send_error_notification_live_triggers_flow(capsys):
+def test_send_error_notification_live_triggers_flow(alerts, capsys):
     flow_url = os.getenv("ERROR_FLOW_URL")
     assert flow_url, "ERROR_FLOW_URL is not set"
     assert "sig=" in flow_url, "ERROR_FLOW_URL must include the signed 'sig=' parameter"
 
-    alerts = _load_alerts_module()
     status, body = alerts.send_error_notification(
         function_name="pytest-live",
         message="Integration probe from tests",
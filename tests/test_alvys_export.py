@@ -0,0 +1,208 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest  # type: ignore
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pyodbc needs the unixODBC runtime, which is not present on every dev box.
+alvys_export = pytest.importorskip("alvys_export", exc_type=ImportError)
+
+
+def _fake_pages(total, fail=()):
+    """Stand-in for ``_fetch_page`` serving ``total`` records.
+
+    Pages listed in ``fail`` raise instead; pages past the data answer 404
+    (``None``) like Alvys does.
+    """
+    size = alvys_export.PAGE_SIZE
+
+    async def fetch(session, url, headers, body_tail, page, entity_name):
+        await asyncio.sleep(0)
+        if page in fail:
+            raise RuntimeError(f"boom {page}")
+        start = page * size
+        if start >= total:
+            return None
+        return [{"id": i} for i in range(start, min(start + size, total))]
+
+    return fetch
+
+
+def _run(**kw):
+    return asyncio.run(
+        alvys_export.fetch_paginated_data(None, "url", {}, {"page": 0}, **kw)
+    )
+
+
+def test_fetch_paginated_data_prefetch_collects_all_pages(monkeypatch):
+    monkeypatch.setattr(alvys_export, "_fetch_page", _fake_pages(450))
+
+    items = _run()
+
+    assert [r["id"] for r in items] == list(range(450))
+
+
+def test_fetch_paginated_data_ignores_error_on_page_past_the_end(monkeypatch):
+    # 450 records fill pages 0-2; page 3 is only requested speculatively.
+    monkeypatch.setattr(alvys_export, "_fetch_page", _fake_pages(450, fail={3}))
+
+    items = _run()
+
+    assert [r["id"] for r in items] == list(range(450))
+
+
+def test_fetch_paginated_data_raises_error_on_page_within_data(monkeypatch):
+    monkeypatch.setattr(alvys_export, "_fetch_page", _fake_pages(450, fail={1}))
+
+    with pytest.raises(RuntimeError, match="boom 1"):
+        _run()
+
+
+def test_save_json_stamps_file_id(tmp_path):
+    data = [{"id": 1}, {}]
+
+    alvys_export.save_json(data, "out.json", tmp_path, file_id="F1")
+
+    out = alvys_export.orjson.loads((tmp_path / "out.json").read_bytes())
+    assert out == [{"id": 1, "FILE_ID": "F1"}, {"FILE_ID": "F1"}]
+    assert data == [{"id": 1}, {}]
+
+
+def test_save_json_overwrites_existing_file_id(tmp_path):
+    data = [{"id": 1, "FILE_ID": "old"}]
+
+    alvys_export.save_json(data, "out.json", tmp_path, file_id="F1")
+
+    raw = (tmp_path / "out.json").read_bytes()
+    assert raw.count(b'"FILE_ID"') == 1
+    assert alvys_export.orjson.loads(raw) == [{"id": 1, "FILE_ID": "F1"}]
+    assert data[0]["FILE_ID"] == "old"
+
+
+def _http_error(status):
+    from yarl import URL
+
+    aiohttp = alvys_export.aiohttp
+    url = URL("https://integrations.alvys.com/api/p/v1/drivers/search")
+    info = aiohttp.RequestInfo(url, "POST", {}, url)
+    return aiohttp.ClientResponseError(info, (), status=status)
+
+
+def test_export_entity_refreshes_token_once_on_401(monkeypatch, tmp_path):
+    creds = {"tenant_id": "t", "client_id": "c"}
+    key = ("t", "c")
+    monkeypatch.setitem(alvys_export._TOKEN_CACHE, key, ("old", float("inf")))
+    headers = {"Authorization": "Bearer old"}
+    seen = []
+
+    async def fetch(session, url, hdrs, payload, entity_name=""):
+        seen.append(hdrs["Authorization"])
+        if hdrs["Authorization"] == "Bearer old":
+            raise _http_error(401)
+        return [{"id": 1}]
+
+    async def reauth(rejected):
+        alvys_export._evict_token(creds, rejected.removeprefix("Bearer "))
+        headers["Authorization"] = "Bearer new"
+
+    monkeypatch.setattr(alvys_export, "fetch_paginated_data", fetch)
+    monkeypatch.setattr(alvys_export, "send_error_notification", lambda *a: pytest.fail("notified"))
+
+    asyncio.run(alvys_export._export_entity(
+        None, "DRIVERS", "url", headers, {}, "DRIVERS.json", tmp_path, reauth=reauth,
+    ))
+
+    assert seen == ["Bearer old", "Bearer new"]
+    assert key not in alvys_export._TOKEN_CACHE
+    assert (tmp_path / "DRIVERS.json").exists()
+
+
+def test_export_entity_gives_up_after_second_401(monkeypatch, tmp_path):
+    calls = []
+
+    async def fetch(session, url, hdrs, payload, entity_name=""):
+        calls.append(1)
+        raise _http_error(401)
+
+    async def reauth(rejected):
+        pass
+
+    notified = []
+    monkeypatch.setattr(alvys_export, "fetch_paginated_data", fetch)
+    monkeypatch.setattr(alvys_export, "send_error_notification", lambda *a: notified.append(a))
+
+    asyncio.run(alvys_export._export_entity(
+        None, "DRIVERS", "url", {"Authorization": "Bearer x"}, {}, "DRIVERS.json", tmp_path,
+        reauth=reauth,
+    ))
+
+    assert len(calls) == 2
+    assert len(notified) == 1
+
+
+def test_evict_token_keeps_a_token_already_refreshed(monkeypatch):
+    creds = {"tenant_id": "t", "client_id": "c"}
+    monkeypatch.setitem(alvys_export._TOKEN_CACHE, ("t", "c"), ("fresh", float("inf")))
+
+    alvys_export._evict_token(creds, "stale")
+
+    assert alvys_export._TOKEN_CACHE[("t", "c")][0] == "fresh"
+
+
+class _Resp:
+    def __init__(self, status, headers=None, body=b'{"Items": []}'):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise _http_error(self.status)
+
+    async def read(self):
+        return self._body
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def post(self, url, headers=None, data=None):
+        return self.responses.pop(0)
+
+
+def test_fetch_page_retries_429_honouring_retry_after(monkeypatch):
+    waits = []
+
+    async def sleep(delay):
+        waits.append(delay)
+
+    monkeypatch.setattr(alvys_export.asyncio, "sleep", sleep)
+    session = _Session([
+        _Resp(429, {"Retry-After": "7"}),
+        _Resp(429),
+        _Resp(200, body=b'{"Items": [{"id": 1}]}'),
+    ])
+
+    batch = asyncio.run(alvys_export._fetch_page(session, "url", {}, b"}", 0, "LOADS"))
+
+    assert batch == [{"id": 1}]
+    assert waits == [7.0, alvys_export.RETRY_BACKOFF * 2]
+
+
+def test_retry_after_parses_delta_and_http_date_and_caps():
+    assert alvys_export._retry_after(None) is None
+    assert alvys_export._retry_after("soon") is None
+    assert alvys_export._retry_after("2.5") == 2.5
+    assert alvys_export._retry_after("3600") == alvys_export.RETRY_AFTER_MAX
+    assert alvys_export._retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
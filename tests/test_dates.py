@@ -0,0 +1,28 @@
+import sys
+from datetime import timedelta, timezone
+from pathlib import Path
+
+import pytest # type: ignore
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.dates import get_last_week_range, iso_range  # noqa: E402
+
+
+@pytest.mark.parametrize("weeks_ago", [0, 2])
+def test_iso_range_matches_get_last_week_range(weeks_ago):
+    tz = timezone(timedelta(hours=-7))
+    start, end = get_last_week_range(weeks_ago, tz)
+
+    assert iso_range(weeks_ago, tz) == (
+        start.isoformat(timespec="milliseconds"),
+        end.isoformat(timespec="milliseconds"),
+    )
+    assert iso_range(weeks_ago, tz)[0].endswith("T00:00:00.000-07:00")
+
+
+def test_iso_range_rejects_negative_weeks():
+    with pytest.raises(ValueError):
+        iso_range(-1)
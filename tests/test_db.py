@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+import pytest  # type: ignore
+from sqlalchemy import types
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pyodbc needs the unixODBC runtime, which is not present on every dev box.
+db = pytest.importorskip("db", exc_type=ImportError)
+
+
+def test_input_sizes_binds_strings_wide_by_column_length():
+    dtypes = {"NAME": types.VARCHAR(100), "AMOUNT": types.Numeric(18, 2)}
+
+    sizes = db.input_sizes(["NAME", "AMOUNT", "OTHER"], dtypes)
+
+    assert sizes == [(db.pyodbc.SQL_WVARCHAR, 100, 0), None, None]
+
+
+def test_input_sizes_fit_non_ascii_values_truncated_by_characters():
+    from inserts.loads_insert import DTYPE_LOADS, _s
+
+    # 2-3 bytes per character in UTF-8 / a non-Latin-1 code point: a
+    # byte-sized narrow buffer would overflow or mangle these.
+    value = _s("Łódź Café Ελλάδα " * 20, 100)
+    (sql_type, size, _), = db.input_sizes(["FLEET_NAME"], DTYPE_LOADS)
+
+    assert sql_type == db.pyodbc.SQL_WVARCHAR
+    assert len(value) == size
+    assert len(value.encode("utf-8")) > size
+
+
+class _Cursor:
+    fast_executemany = False
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def executemany(self, sql, params):
+        self.calls.append((sql, list(params), self.fast_executemany))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Conn:
+    def __init__(self):
+        self.calls = []
+        self.commits = 0
+
+    def cursor(self):
+        return _Cursor(self.calls)
+
+    def commit(self):
+        self.commits += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_exec_client_upload_ids_runs_plain_executemany_once(monkeypatch):
+    conn = _Conn()
+    monkeypatch.setattr(db, "get_conn", lambda: conn)
+    monkeypatch.setattr(db, "_current_upload_id", lambda: "20261012")
+
+    db.exec_client_upload_ids(["AAAA", "BBBB", "AAAA"])
+
+    assert conn.calls == [(
+        "EXEC dbo.INSERT_CLIENT_UPLOAD_ID @SCAC=?, @Uploadid=?",
+        [("AAAA", "20261012"), ("BBBB", "20261012")],
+        False,
+    )]
+    assert conn.commits == 1
+
+
+def test_record_upload_ids_failure_is_not_fatal(monkeypatch):
+    import record_upload_ids
+
+    def boom(scacs):
+        raise RuntimeError("proc failed")
+
+    monkeypatch.setattr(record_upload_ids.db, "exec_client_upload_ids", boom)
+
+    assert record_upload_ids.main(["AAAA"]) == 0
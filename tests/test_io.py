@@ -0,0 +1,18 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.io import safe_datetime  # noqa: E402
+
+
+def test_safe_datetime_handles_long_fractions_and_offsets():
+    assert safe_datetime("2024-01-02T03:04:05.1234567Z") == datetime(
+        2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc
+    )
+    assert safe_datetime("2024-01-02T03:04:05.12-05:00").utcoffset().total_seconds() == -5 * 3600
+    assert safe_datetime("garbage") is None
+    assert safe_datetime(None) is None
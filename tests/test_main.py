@@ -0,0 +1,80 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest  # type: ignore
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pyodbc needs the unixODBC runtime, which is not present on every dev box.
+main = pytest.importorskip("main", exc_type=ImportError)
+
+
+class FakeConn:
+    """DBAPI stand-in that records which tables were written and how it ended."""
+
+    def __init__(self):
+        self.driver_connection = types.SimpleNamespace(autocommit=True)
+        self.written: list[str] = []
+        self.committed = self.rolled_back = self.closed = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.written.clear()
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    fake = FakeConn()
+    engine = types.SimpleNamespace(raw_connection=lambda: fake)
+    monkeypatch.setattr(main.db, "get_engine", lambda **kw: engine)
+    return fake
+
+
+def _loader(monkeypatch, ent, fail=False):
+    def loader_main(argv, data_dir=None, conn=None):
+        if fail:
+            raise RuntimeError(f"{ent} failed")
+        conn.written.append(ent)
+
+    mod = types.ModuleType(f"inserts.{ent}_insert")
+    mod.main = loader_main
+    monkeypatch.setitem(sys.modules, mod.__name__, mod)
+
+
+def test_run_insert_commits_every_table_once(monkeypatch, conn, tmp_path):
+    for ent in ("loads", "trips"):
+        _loader(monkeypatch, ent)
+    calls = []
+
+    def aei_main(argv, data_dir=None, conn=None):
+        calls.append(argv)
+        conn.written.append("active")
+
+    monkeypatch.setattr(main.aei, "main", aei_main)
+
+    main.run_insert("abcd", ["loads", "drivers", "trips", "trucks"], False, tmp_path)
+
+    assert conn.written == ["loads", "trips", "active"]
+    assert calls == [["drivers", "trucks", "--scac", "abcd"]]
+    assert conn.committed and not conn.rolled_back and conn.closed
+
+
+def test_run_insert_rolls_back_all_tables_when_one_loader_fails(monkeypatch, conn, tmp_path):
+    _loader(monkeypatch, "loads")
+    _loader(monkeypatch, "invoices")
+    _loader(monkeypatch, "trips", fail=True)
+
+    with pytest.raises(RuntimeError, match="trips failed"):
+        main.run_insert("abcd", ["loads", "invoices", "trips"], False, tmp_path)
+
+    assert conn.rolled_back and not conn.committed and conn.closed
+    assert conn.written == []
@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 import time
@@ -6,8 +7,20 @@ from typing import Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+# One pooled session per worker: warm Function hosts reuse the TLS connection
+# to the Flow endpoint instead of handshaking for every notification.
+# Retry only covers failures urllib3 deems safe for POST (e.g. connect errors).
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=2, backoff_factor=0.2)),
+)
 
+
+@functools.lru_cache(maxsize=1)
 def _init_env() -> None:
     try:
         from dotenv import load_dotenv  # optional; safe if not installed
@@ -34,6 +47,9 @@ def _validate_flow_url(url: str) -> None:
             raise RuntimeError(f"ERROR_FLOW_URL missing required query parameter: {key}")
 
 
+# Resolved and validated once per process; failures are not cached, so a
+# missing/invalid setting is re-checked on the next notification.
+@functools.lru_cache(maxsize=1)
 def _get_flow_url() -> str:
     _init_env()
     raw = os.environ.get("ERROR_FLOW_URL", "")
@@ -68,7 +84,7 @@ def send_error_notification(
             "correlationId": correlation_id or str(uuid.uuid4()),
         },
     }
-    resp = requests.post(url, json=payload, timeout=20)
+    resp = _SESSION.post(url, json=payload, timeout=20)
     status = resp.status_code
     text = getattr(resp, "text", "")
     if status >= 400:
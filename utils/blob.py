@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 from datetime import date, datetime, timezone
@@ -9,12 +10,16 @@ from pathlib import Path
 from typing import Iterable
 
 from azure.core.exceptions import ResourceExistsError # type: ignore
-from azure.storage.blob import BlobServiceClient, ContentSettings # type: ignore
+from azure.storage.blob import ContentSettings # type: ignore
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient # type: ignore
 
 
 # Azure requires: 3–63 chars, lowercase letters/numbers/hyphens, must start/end alphanumeric
 _CONTAINER_RE = re.compile(r"^[a-z0-9](?:[a-z0-9-]{1,61})[a-z0-9]$")
 
+# Concurrent file uploads per run; override with ALVYS_BLOB_UPLOAD_WORKERS.
+UPLOAD_WORKERS = 8
+
 
 def _get_env(name: str) -> str:
     value = os.environ.get(name)
@@ -24,12 +29,11 @@ def _get_env(name: str) -> str:
 
 
 def _normalize_and_validate_container(raw: str) -> str:
-    s = raw.strip()
-    if s.startswith("http://") or s.startswith("https://"):
+    s = raw.strip().lower()
+    if s.startswith(("http://", "https://")):
         raise ValueError(
             "ALVYS_BLOB_CONTAINER must be a container name (e.g., 'alvys-weekly-data'), not a full URL."
         )
-    s = s.lower()
     if not _CONTAINER_RE.match(s):
         raise ValueError(
             "Invalid container name. It must be 3–63 chars, lowercase letters, numbers, and hyphens, and start/end with alphanumeric."
@@ -45,58 +49,90 @@ def _iter_json_files(directory: Path) -> Iterable[Path]:
     return directory.glob("*.json")
 
 
+def _upload_workers() -> int:
+    raw = os.environ.get("ALVYS_BLOB_UPLOAD_WORKERS")
+    return max(1, int(raw)) if raw else UPLOAD_WORKERS
+
+
 def _format_run_folder(run_date: date | None) -> str:
     actual_date = run_date or datetime.now(timezone.utc).date()
     return actual_date.strftime("%Y%m%d")
 
 
-def upload_weekly_json(scac: str, local_dir: Path, *, run_date: date | None = None) -> None:
+def _blob_settings() -> tuple[str, str]:
+    conn_str = _get_env("ALVYS_BLOB_CONN_STR")
+    raw_container = _get_env("ALVYS_BLOB_CONTAINER")
+    return conn_str, _normalize_and_validate_container(raw_container)
+
+
+def _run_prefix(scac: str, run_date: date | None) -> str:
+    return f"{scac.lower()}/{_format_run_folder(run_date)}/"
+
+
+async def upload_weekly_json_async(
+    scac: str, local_dir: Path, *, run_date: date | None = None
+) -> None:
     """
     Upload the week's JSON files for ``scac`` to Azure Blob Storage.
 
     Files are written beneath ``<scac>/<YYYYMMDD>/`` where the folder name is
-    derived from ``run_date`` (or today in UTC when omitted). Each run stores
+    derived from ``run_date``. Orchestrated runs always pass it (taken from
+    the orchestrator's replay-safe clock); the today-in-UTC fallback is only
+    for standalone/CLI use. Each run stores
     data in its own dated directory so previous weeks remain untouched.
 
+    Uses the ``aio`` client (one aiohttp connection pool, so every upload
+    reuses its warm TLS connections) with at most
+    ``ALVYS_BLOB_UPLOAD_WORKERS`` uploads in flight. File contents are read
+    in a worker thread so disk I/O never blocks the loop. The client is
+    built per call rather than cached: its aiohttp session is bound to the
+    running loop, and each activity call runs its own loop.
+
     Environment variables:
       ALVYS_BLOB_CONN_STR  - Azure Storage connection string
       ALVYS_BLOB_CONTAINER - Container name (e.g., 'alvys-weekly-data')
-    """
-    conn_str = _get_env("ALVYS_BLOB_CONN_STR")
-    raw_container = _get_env("ALVYS_BLOB_CONTAINER")
-    container_name = _normalize_and_validate_container(raw_container)
+      ALVYS_BLOB_UPLOAD_WORKERS - Optional upload concurrency (default 8)
 
-    service = BlobServiceClient.from_connection_string(conn_str)
-    container = service.get_container_client(container_name)
-
-    try:
-        container.create_container()
-    except ResourceExistsError:
-        pass
-
-    scac = scac.lower()
-    run_folder = _format_run_folder(run_date)
-    prefix = f"{scac}/"
-    run_prefix = f"{prefix}{run_folder}/"
-
-    # Upload current week's files with JSON content type
+    Raises ``FileNotFoundError`` when ``local_dir`` holds no ``*.json`` files
+    and ``FileExistsError`` when a blob already exists for this run.
+    """
+    conn_str, container_name = _blob_settings()
+    run_prefix = _run_prefix(scac, run_date)
     content_settings = ContentSettings(content_type="application/json")
-    any_file = False
-    for path in _iter_json_files(local_dir):
-        any_file = True
-        dest_name = run_prefix + path.name
-        with path.open("rb") as fh:
-            blob_client = container.get_blob_client(dest_name)
-            try:
-                blob_client.upload_blob(
-                    fh,
-                    overwrite=False,
-                    content_settings=content_settings,
-                )
-            except ResourceExistsError as exc:
-                raise FileExistsError(
-                    f"Blob already exists for this run: {dest_name}"
-                ) from exc
-    if not any_file:
-        # No files is considered a hard error to avoid silently doing nothing.
-        raise FileNotFoundError(f"No *.json files found in {local_dir}")
+    limit = asyncio.Semaphore(_upload_workers())
+
+    async with AsyncBlobServiceClient.from_connection_string(conn_str) as service:
+        container = service.get_container_client(container_name)
+        try:
+            await container.create_container()
+        except ResourceExistsError:
+            pass
+
+        async def _upload_one(path: Path) -> None:
+            dest_name = run_prefix + path.name
+            async with limit:
+                data = await asyncio.to_thread(path.read_bytes)
+                try:
+                    await container.get_blob_client(dest_name).upload_blob(
+                        data,
+                        overwrite=False,
+                        content_settings=content_settings,
+                        length=len(data),
+                    )
+                except ResourceExistsError as exc:
+                    raise FileExistsError(
+                        f"Blob already exists for this run: {dest_name}"
+                    ) from exc
+
+        paths = list(_iter_json_files(local_dir))
+        if not paths:
+            # No files is considered a hard error to avoid silently doing nothing.
+            raise FileNotFoundError(f"No *.json files found in {local_dir}")
+        tasks = [asyncio.ensure_future(_upload_one(path)) for path in paths]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
@@ -16,7 +16,8 @@ calls-ideal for unit testing.
 """
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import functools
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Tuple
 
 # ---------------------------------------------------------------------------
@@ -43,6 +44,22 @@ def _start_of_week(dt: datetime, tz: timezone = UTC) -> datetime:
     return dt - timedelta(days=days_since_sunday)
 
 
+@functools.lru_cache(maxsize=32)
+def _week_range(today: date, weeks_ago: int, tz: timezone) -> Tuple[datetime, datetime]:
+    """Pure part of :func:`get_last_week_range`, memoised per calendar day."""
+    start_of_current_week = _start_of_week(datetime.combine(today, time(), tzinfo=tz), tz)
+
+    # The week we’re interested in is the one *before* the current week.
+    start = start_of_current_week - timedelta(days=7 * (weeks_ago + 1))
+    end = start + timedelta(days=7,
+                            hours=5,
+                            minutes=59,
+                            seconds=59,
+                            milliseconds=999)
+
+    return start, end
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -56,29 +73,24 @@ def get_last_week_range(weeks_ago: int = 0, tz: timezone = UTC) -> Tuple[datetim
     if weeks_ago < 0:
         raise ValueError("weeks_ago must be >= 0")
 
-    now = datetime.now(tz)
-    start_of_current_week = _start_of_week(now, tz)
-
-    # The week we’re interested in is the one *before* the current week.
-    start = start_of_current_week - timedelta(days=7 * (weeks_ago + 1))
-    end = start + timedelta(days=7,
-                            hours=5,
-                            minutes=59,
-                            seconds=59,
-                            milliseconds=999)
-
-    return start, end
+    return _week_range(datetime.now(tz).date(), weeks_ago, tz)
 
 
-def iso_range(
-    reference: datetime | None = None,
-    tz: timezone = timezone.utc,
-) -> Tuple[str, str]:
-    """Convenience wrapper that returns the tuple as ISO‑8601 strings exactly
-    to the millisecond (*YYYY‑MM‑DDTHH:MM:SS.mmmZ*)."""
-
-    start_dt, end_dt = get_last_week_range(reference, tz)
+@functools.lru_cache(maxsize=16)
+def _iso_week_range(today: date, weeks_ago: int, tz: timezone) -> Tuple[str, str]:
+    start_dt, end_dt = _week_range(today, weeks_ago, tz)
     return (
         start_dt.isoformat(timespec="milliseconds"),
         end_dt.isoformat(timespec="milliseconds"),
     )
+
+
+def iso_range(weeks_ago: int = 0, tz: timezone = UTC) -> Tuple[str, str]:
+    """Convenience wrapper that returns :func:`get_last_week_range` as ISO‑8601
+    strings exactly to the millisecond (*YYYY‑MM‑DDTHH:MM:SS.mmm+HH:MM*).
+
+    Takes the same arguments; the string pair is cached per calendar day.
+    """
+    if weeks_ago < 0:
+        raise ValueError("weeks_ago must be >= 0")
+    return _iso_week_range(datetime.now(tz).date(), weeks_ago, tz)
@@ -1,35 +1,66 @@
 #!/usr/bin/env python
 """Utility helpers for working with datetimes.
 
-Currently exposes :func:`to_utc_naive` which converts pandas ``Series`` or
-scalar values to naive UTC ``datetime`` objects, mirroring the conversion
-logic previously duplicated across insert scripts.
+Exposes :func:`to_utc_naive` which converts pandas ``Series`` or scalar
+values to naive UTC ``datetime`` objects, mirroring the conversion logic
+previously duplicated across insert scripts, and :func:`to_utc_naive_array`
+for converting any iterable in one vectorised call.
 """
 
 from __future__ import annotations
 
-from typing import Any
+import warnings
+from typing import Any, Iterable
 
 import pandas as pd
 
 
-def to_utc_naive(series_or_val: Any):
+def to_utc_naive(series_or_val: Any, format: str | None = None):
     """Convert a Series or scalar to naive UTC datetimes.
 
     Parameters
     ----------
     series_or_val:
         A :class:`pandas.Series` or a scalar value representing date/time(s).
+    format:
+        Passed through to :func:`pandas.to_datetime`. ``"ISO8601"`` takes the
+        C fast path and accepts mixed ISO variants (``Z``, offsets, 1-7
+        fractional digits) that format inference would coerce to ``NaT``.
 
     Returns
     -------
     Series | datetime | None
         The converted naive UTC timestamps. Invalid inputs result in ``None``.
+
+    Scalars are deprecated: each call builds a pandas ``Timestamp``, which is
+    far slower per value than converting the whole column at once with
+    :func:`to_utc_naive_array`.
     """
 
     if isinstance(series_or_val, pd.Series):
-        return pd.to_datetime(series_or_val, utc=True, errors="coerce").dt.tz_localize(None)
-    if series_or_val:
-        return pd.to_datetime(series_or_val, utc=True, errors="coerce").tz_localize(None)
-    return None
+        return pd.to_datetime(series_or_val, utc=True, errors="coerce", format=format).dt.tz_localize(None)
+    warnings.warn(
+        "to_utc_naive() on scalars is deprecated; convert whole columns with "
+        "to_utc_naive_array()",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    if series_or_val is None or (isinstance(series_or_val, str) and not series_or_val):
+        return None
+    try:
+        if pd.isna(series_or_val):  # NaN/NaT/NA scalars
+            return None
+    except (TypeError, ValueError):  # array-likes: no single truth value
+        pass
+    return pd.to_datetime(series_or_val, utc=True, errors="coerce", format=format).tz_localize(None)
+
 
+def to_utc_naive_array(vals: Iterable[Any], format: str | None = "ISO8601") -> pd.Series:
+    """Convert an iterable of date/time values to a naive UTC ``Series``.
+
+    Always takes the vectorised :func:`to_utc_naive` Series path; values are
+    kept as objects so mixed ``None``/string input is not coerced first.
+    Unparseable entries become ``NaT``.
+    """
+    series = vals if isinstance(vals, pd.Series) else pd.Series(list(vals), dtype=object)
+    return to_utc_naive(series, format=format)
@@ -1,45 +1,80 @@
 """Durable orchestrator for weekly Alvys data ingest."""
 from typing import Dict, List
 import logging
+import os
 import azure.durable_functions as df
 
 from main import DATA_DIR
 
+# Clients ingested at once. Each ingest_client runs a full export, its own
+# SQL connections and per-entity process pools, so the fan-out is windowed.
+INGEST_CONCURRENCY = 4
+
+
+def _ingest_window() -> int:
+    # App settings are fixed for a deployment, so replays see the same value.
+    raw = os.environ.get("ALVYS_INGEST_CONCURRENCY")
+    return max(1, int(raw)) if raw else INGEST_CONCURRENCY
+
 
 def orchestrator_function(context: df.DurableOrchestrationContext):
     try:
         # get the list of clients (SCAC + creds) via an activity (I/O outside orchestrator)
-        clients: List[Dict[str, str]] = yield context.call_activity("list_clients", None)
+        # Each client arrives as {"scac": ..., "credentials": {...}}.
+        clients: List[Dict] = yield context.call_activity("list_clients", None)
 
         failed_entity = df.EntityId("failed_scacs", "log")
 
-        # Fan-out sequentially with per-client error capture (simple + durable-safe)
-        for c in clients:
-            scac = c["SCAC"]
-            creds = {
-                "tenant_id": c["TENANT_ID"],
-                "client_id": c["CLIENT_ID"],
-                "client_secret": c["CLIENT_SECRET"],
-                "grant_type": c["GRANT_TYPE"],
-            }
-            payload = {
-                "scac": scac,
-                "credentials": creds,
-                "data_dir": str(DATA_DIR / scac.upper()),
+        # Fan-out in windows: up to _ingest_window() clients ingest
+        # concurrently; each sub-orchestration reports its outcome instead of
+        # raising, so one failure can't abort the batch.
+        # Replay-safe clock: every client's blobs land in the same dated folder.
+        run_date = context.current_utc_datetime.date().isoformat()
+        payloads = [
+            {
+                **c,
+                "data_dir": str(DATA_DIR / c["scac"].upper()),
+                "run_date": run_date,
             }
-            try:
-                yield context.call_activity("ingest_client", payload)
-            except Exception as err:  # keep going; record who failed
+            for c in clients
+        ]
+        window = _ingest_window()
+        results: List[Dict] = []
+        for i in range(0, len(payloads), window):
+            tasks = [
+                context.call_sub_orchestrator("ingest_one_safe", p)
+                for p in payloads[i:i + window]
+            ]
+            results.extend((yield context.task_all(tasks)))
+
+        succeeded: List[str] = []
+        notifications = []
+        for r in results:
+            scac = r["scac"]
+            if r["ok"]:
+                succeeded.append(scac)
+                continue
+            err = r["err"]
+            if not context.is_replaying:
                 logging.error("Ingest failed for %s: %s", scac, err)
-                context.signal_entity(failed_entity, "add", scac)
-                yield context.call_activity(
+            context.signal_entity(failed_entity, "add", scac)
+            notifications.append(
+                context.call_activity(
                     "notify_failure",
                     {
                         "functionName": "ingest_client",
                         "message": f"Ingest failed for {scac}: {err}",
-                        "stackTrace": getattr(err, "stack_trace", str(err)),
+                        "stackTrace": err,
                     },
                 )
+            )
+        if notifications:
+            yield context.task_all(notifications)
+
+        # One connection records every client that made it through; the
+        # activity reports its own failures and never fails the run.
+        if succeeded:
+            yield context.call_activity("record_upload_ids", succeeded)
 
         return "OK"
     except Exception as err: